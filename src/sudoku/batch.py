@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+#headless batch solving: python3 -m sudoku.batch puzzles.txt
+#streams puzzles from a file (or stdin), solves them on a process pool and writes one solution line
+#per puzzle, in input order, to stdout or a file.  a summary with puzzles/second goes to stderr.
+#the input can be a sudoku.packed binary file as well, that's picked up from the first bytes of it.
+#multiprocessing and numpy (for --vectorised) are only imported once they're used, importing this and
+#starting a worker process stay cheap.  benchmark --imports keeps an eye on that.
+
+import sys, logging, argparse, os, time, itertools
+from functools import partial
+
+import sudoku.utils as utils
+import sudoku.puzzles as puzzles
+import sudoku.engine as engine
+import sudoku.engines as engines
+import sudoku.cache as cache
+import sudoku.instrumentation as instrumentation
+import sudoku.packed as packed
+from sudoku.puzzles import NO_SOLUTION, MULTIPLE_SOLUTIONS
+
+DEFAULT_CHUNKSIZE = 64
+#numpy wants big batches, the per chunk overhead is what it's there to get rid of.
+DEFAULT_VECTORISED_CHUNKSIZE = 2048
+
+#each worker process gets its own solution cache, None when caching is off.
+worker_cache = None
+
+def init_worker(cache_size, cache_file):
+    global worker_cache
+    if cache_size > 0:
+        worker_cache = cache.SolutionCache(cache_size, cache_file)
+
+#runs in the worker processes, so it gets the raw line and does the parsing there too.  a line is
+#text, or the packed cells of a size x size puzzle when size isn't None.
+#returns the output line and the stats dict of the solve.
+#with check_unique it looks for a second solution too, the cache only keeps one so it's skipped then.
+def solve_line(engine_name, propagation, instrumented, check_unique, size, numbered_line):
+    grid = parse_line(size, numbered_line)
+    stats = {'cached': False}
+    if check_unique:
+        solutions_fn = instrumentation.solutions if instrumented else engines.solutions
+        solutions = solutions_fn(grid, 2, stats, engine_name, propagation)
+        if len(solutions) > 1:
+            return MULTIPLE_SOLUTIONS, stats
+        return (puzzles.format_grid(solutions[0]) if solutions else NO_SOLUTION), stats
+    solve_fn = instrumentation.solve if instrumented else engines.solve
+    if worker_cache is not None:
+        solution = cache.solve(grid, worker_cache, stats, engine_name, propagation, solve_fn)
+        #the cache lives in the worker, the parent keeps the latest counters of every worker.
+        stats['cache'] = (os.getpid(), worker_cache.counters())
+    else:
+        solution = solve_fn(grid, stats, engine_name, propagation)
+    return (puzzles.format_grid(solution) if solution is not None else NO_SOLUTION), stats
+
+def parse_line(size, numbered_line):
+    line_number, line = numbered_line
+    try:
+        return puzzles.parse_line(line) if size is None else packed.unpack_grid(line, size)
+    except ValueError as e:
+        raise ValueError('line %s: %s' % (line_number, e))
+
+#solve_line for --vectorised, a whole chunk of lines at once through the numpy singles.
+#stats gets 'vectorised', True for the puzzles that didn't need the engine at all.
+def solve_chunk(engine_name, propagation, size, numbered_lines):
+    import sudoku.vectorised as vectorised
+    solutions, guesses = vectorised.solve_batch([parse_line(size, numbered_line) for numbered_line in numbered_lines], engine_name, propagation)
+    return [((puzzles.format_grid(solution) if solution is not None else NO_SOLUTION), {'cached': False, 'guesses': puzzle_guesses or 0, 'vectorised': puzzle_guesses is None})
+            for solution, puzzle_guesses in zip(solutions, guesses)]
+
+def chunked(lines, chunksize):
+    lines = iter(lines)
+    while True:
+        chunk = list(itertools.islice(lines, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+#solve_stream for --vectorised, chunks go to the workers instead of single lines.
+def solve_stream_vectorised(lines, engine_name, propagation, workers, chunksize, size=None):
+    solve_fn = partial(solve_chunk, engine_name, propagation, size)
+    if workers == 1:
+        for chunk in chunked(lines, chunksize):
+            yield from solve_fn(chunk)
+        return
+    if size is not None:
+        lines = ((line_number, bytes(line)) for line_number, line in lines)
+    import multiprocessing
+    with multiprocessing.Pool(workers) as pool:
+        for results in pool.imap(solve_fn, chunked(lines, chunksize)):
+            yield from results
+
+def solve_stream(lines, engine_name, propagation, workers, chunksize, cache_size=0, cache_file=None, instrumented=False, check_unique=False, size=None):
+    solve_fn = partial(solve_line, engine_name, propagation, instrumented, check_unique, size)
+    if workers == 1:
+        #no point paying for a pool with a single worker.
+        init_worker(cache_size, cache_file)
+        yield from map(solve_fn, lines)
+        return
+    if size is not None:
+        #memoryviews don't pickle, the few bytes of a record are copied out for the trip.
+        lines = ((line_number, bytes(line)) for line_number, line in lines)
+    import multiprocessing
+    with multiprocessing.Pool(workers, init_worker, (cache_size, cache_file)) as pool:
+        #imap hands the results back in input order, chunksize puzzles per round trip.
+        yield from pool.imap(solve_fn, lines, chunksize)
+
+def setup_args(argv=None):
+    arg_parser = argparse.ArgumentParser(prog='solve-batch', description='Solve a file of sudokus, one per line.')
+    arg_parser.add_argument('input', help="puzzle file, one puzzle per line, '.' or '0' for blanks, or a packed binary file.  '-' reads stdin.")
+    arg_parser.add_argument('--output', '-o', help="where the solutions go, one per line in input order, default: stdout.", default='-')
+    arg_parser.add_argument('--workers', help='number of worker processes, default: one per cpu.', type=utils.positive_int, default=os.cpu_count() or 1)
+    arg_parser.add_argument('--chunksize', help='puzzles handed to a worker at a time, default: ' + str(DEFAULT_CHUNKSIZE) + ', ' + str(DEFAULT_VECTORISED_CHUNKSIZE) + ' with --vectorised.', type=utils.positive_int, default=None)
+    arg_parser.add_argument('--engine', help='solver backend, default: ' + engines.DEFAULT_ENGINE + '.', choices=list(engines.ENGINES), default=engines.DEFAULT_ENGINE)
+    arg_parser.add_argument('--propagation', help='constraint propagation for the backtracking engine, default: ' + engine.DEFAULT_PROPAGATION + '.', choices=list(engine.PROPAGATION_LEVELS), default=engine.DEFAULT_PROPAGATION)
+    arg_parser.add_argument('--cache', help='solutions to keep in each worker\'s cache, keyed by canonical puzzle form, default: 0 (off).', type=int, default=0)
+    arg_parser.add_argument('--cache-file', help='sqlite file that keeps cached solutions across runs, needs --cache.', default=None)
+    arg_parser.add_argument('--check-unique', help="validate the puzzles: keep searching after the first solution and write '" + MULTIPLE_SOLUTIONS + "' for the ones with more than one.  --cache is not used.", action='store_true')
+    arg_parser.add_argument('--stats', help='collect search counters (nodes, backtracks, depth, eliminations, setup/search time) and log the totals.', action='store_true')
+    arg_parser.add_argument('--profile', help='profile the run and write the pstats output to this file.  runs everything in this process, --workers is ignored.', metavar='FILE', default=None)
+    arg_parser.add_argument('--vectorised', help='run naked and hidden singles on whole chunks at once with numpy, only the puzzles they leave unsolved go to the engine.  needs numpy, and does not go with --check-unique, --cache or --stats.', action='store_true')
+    arg_parser.add_argument('--debug', help='turn on debugging information', action='store_true')
+    args = arg_parser.parse_args(argv)
+    if args.profile is not None:
+        args.workers = 1
+    if args.vectorised:
+        import sudoku.vectorised as vectorised
+        if not vectorised.available():
+            arg_parser.error('--vectorised needs numpy, which is not installed.')
+        if args.check_unique or args.cache > 0 or args.stats:
+            arg_parser.error('--vectorised does not go with --check-unique, --cache or --stats.')
+    if args.chunksize is None:
+        args.chunksize = DEFAULT_VECTORISED_CHUNKSIZE if args.vectorised else DEFAULT_CHUNKSIZE
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO, stream=sys.stderr)
+    return args
+
+def main(argv=None):
+    args = setup_args(argv)
+    logger = logging.getLogger(__name__)
+
+    count = solved = multiple = guesses = vectorised_count = 0
+    cache_counters = {}
+    counters = {}
+    start_time = time.perf_counter()
+    input_file = output_file = None
+    try:
+        if packed.is_packed(args.input):
+            input_file = packed.PackedReader(args.input)
+            lines, size = enumerate(input_file, 1), input_file.size
+        else:
+            input_file = puzzles.open_input(args.input)
+            lines, size = puzzles.read_lines(input_file), None
+        output_file = puzzles.open_output(args.output)
+        with instrumentation.profiled(args.profile):
+            if args.vectorised:
+                results = solve_stream_vectorised(lines, args.engine, args.propagation, args.workers, args.chunksize, size)
+            else:
+                results = solve_stream(lines, args.engine, args.propagation, args.workers, args.chunksize, args.cache, args.cache_file, args.stats, args.check_unique, size)
+            for line, stats in results:
+                output_file.write(line + '\n')
+                count += 1
+                guesses += stats['guesses']
+                if 'cache' in stats:
+                    pid, worker_counters = stats['cache']
+                    cache_counters[pid] = worker_counters
+                vectorised_count += stats.get('vectorised', False)
+                if line == MULTIPLE_SOLUTIONS:
+                    multiple += 1
+                elif line != NO_SOLUTION:
+                    solved += 1
+                if args.stats and not stats['cached']:
+                    instrumentation.add_counters(counters, stats)
+    except (OSError, ValueError) as e:
+        logger.error(e)
+        return 1
+    finally:
+        if input_file is not None and input_file is not sys.stdin:
+            input_file.close()
+        if output_file is sys.stdout:
+            output_file.flush()
+        elif output_file is not None:
+            output_file.close()
+    elapsed = time.perf_counter() - start_time
+
+    rate = count / elapsed if elapsed > 0 else 0.0
+    logger.info("%s puzzles, %s solved, %s guesses in %.3fs: %.1f puzzles/s, %.1f puzzles/s per worker" % (count, solved, guesses, elapsed, rate, rate / args.workers))
+    if args.vectorised:
+        logger.info("solved by the vectorised singles alone: %s" % vectorised_count)
+    if args.check_unique:
+        logger.info("unique: %s, multiple solutions: %s, no solution: %s" % (solved, multiple, count - solved - multiple))
+    if args.cache > 0 and not args.check_unique:
+        totals = {counter: sum(worker_counters[counter] for worker_counters in cache_counters.values()) for counter in ('hits', 'misses', 'evictions', 'size')}
+        logger.info("cache hits: %s, misses: %s, evictions: %s, entries: %s, over %s worker caches" % (totals['hits'], totals['misses'], totals['evictions'], totals['size'], len(cache_counters)))
+    if args.stats:
+        logger.info("counters: %s" % counters)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
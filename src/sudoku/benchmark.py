@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+
+#benchmark: python3 -m sudoku.benchmark [-o results.json] [--compare old.json]
+#runs every puzzle in sudoku.corpus through every engine a few times and writes the median and p95
+#wall time, the guess count, the peak memory and the search counters of each puzzle out as json, so two
+#runs can be diffed.
+#--imports times the cold start of the headless modules instead, each imported in a fresh interpreter
+#under python -X importtime, and fails if any of them pulls in tkinter.
+
+import sys, logging, argparse, json, math, os, platform, subprocess, time, tracemalloc
+
+import sudoku.utils as utils
+import sudoku.puzzles as puzzles
+import sudoku.corpus as corpus
+import sudoku.engine as engine
+import sudoku.engines as engines
+import sudoku.instrumentation as instrumentation
+import sudoku.packed as packed
+
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 1.2
+#what batch workers and the other command line tools import, none of them should need a display.
+HEADLESS_MODULES = ['sudoku.engine', 'sudoku.engines', 'sudoku.puzzles', 'sudoku.packed', 'sudoku.cache',
+                    'sudoku.batch', 'sudoku.parallel', 'sudoku.generator', 'sudoku.service', 'sudoku.benchmark']
+GUI_MODULES = ['tkinter']
+#slow to import and only wanted by some runs, listed in the report when a module pulls them in.
+HEAVY_MODULES = GUI_MODULES + ['numpy', 'sqlite3', 'multiprocessing', 'asyncio', 'concurrent.futures', 'cProfile', 'pstats', 'pprint']
+
+#nearest rank, good enough for a handful of samples.
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+def median(samples):
+    ordered = sorted(samples)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+def run_once(grid, engine_name, propagation):
+    stats = {}
+    start_time = time.perf_counter()
+    solution = engines.solve(grid, stats, engine_name, propagation)
+    return time.perf_counter() - start_time, solution is not None, stats['guesses']
+
+def peak_memory(grid, engine_name, propagation):
+    #tracemalloc slows everything down a lot, so this is its own run and never timed.
+    tracemalloc.start()
+    try:
+        engines.solve(grid, None, engine_name, propagation)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def search_counters(grid, engine_name, propagation):
+    #same idea as the memory run, the instrumented boards are slower so they get a run of their own.
+    stats = {}
+    instrumentation.solve(grid, stats, engine_name, propagation)
+    return stats
+
+def benchmark_puzzle(grid, engine_name, propagation, repeat):
+    times = []
+    for _ in range(repeat):
+        elapsed, solved, guesses = run_once(grid, engine_name, propagation)
+        times.append(elapsed)
+    return {'solved': solved,
+            'guesses': guesses,
+            'median_s': median(times),
+            'p95_s': percentile(times, 0.95),
+            'peak_bytes': peak_memory(grid, engine_name, propagation),
+            'counters': search_counters(grid, engine_name, propagation)}
+
+#(class, name, grid) for every puzzle of the corpus classes.
+def corpus_puzzles(classes):
+    for puzzle_class in classes:
+        for name, line in corpus.CORPUS[puzzle_class]:
+            yield puzzle_class, name, puzzles.parse_line(line)
+
+#(class, name, grid) for every puzzle in a text or packed file, the class is the file name and the
+#name the line or record number.  read again for every engine rather than kept around.
+def file_puzzles(path):
+    if packed.is_packed(path):
+        reader = packed.PackedReader(path)
+        try:
+            for number, view in enumerate(reader, 1):
+                yield path, str(number), packed.unpack_grid(view, reader.size)
+        finally:
+            reader.close()
+        return
+    with open(path, 'r') as f:
+        for line_number, line in puzzles.read_lines(f):
+            yield path, str(line_number), puzzles.parse_line(line)
+
+def run(engine_names, classes, propagation, repeat, input_path=None):
+    logger = logging.getLogger(__name__)
+    results = []
+    for engine_name in engine_names:
+        for puzzle_class, name, grid in (corpus_puzzles(classes) if input_path is None else file_puzzles(input_path)):
+            result = benchmark_puzzle(grid, engine_name, propagation, repeat)
+            result.update({'engine': engine_name, 'class': puzzle_class, 'puzzle': name})
+            logger.info("%-10s %-12s %-20s median %.4fs  p95 %.4fs  guesses %6s  peak %s KiB" % (engine_name, puzzle_class, name, result['median_s'], result['p95_s'], result['guesses'], result['peak_bytes'] // 1024))
+            results.append(result)
+    return {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'repeat': repeat,
+            'propagation': propagation,
+            'results': results}
+
+#one fresh interpreter importing module under -X importtime.  returns the module's cumulative import
+#time in seconds and the names of every module that got imported along the way.
+def import_once(module):
+    environment = dict(os.environ)
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment['PYTHONPATH'] = os.pathsep.join([package_root] + ([environment['PYTHONPATH']] if environment.get('PYTHONPATH') else []))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module], env=environment, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError('importing %s failed: %s' % (module, result.stderr.strip().splitlines()[-1]))
+    cumulative = None
+    imported = set()
+    #lines look like 'import time:  self [us] | cumulative | imported package', the header line included.
+    for line in result.stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].strip()
+        imported.add(name)
+        if name == module:
+            cumulative = int(fields[1]) / 1e6
+    return cumulative, imported
+
+def run_imports(modules, repeat):
+    logger = logging.getLogger(__name__)
+    results = {}
+    for module in modules:
+        times = []
+        for _ in range(repeat):
+            elapsed, imported = import_once(module)
+            times.append(elapsed)
+        heavy = [name for name in HEAVY_MODULES if name in imported]
+        results[module] = {'median_s': median(times), 'p95_s': percentile(times, 0.95), 'heavy': heavy}
+        logger.info("%-20s median %.1fms  p95 %.1fms  %s" % (module, median(times) * 1000, percentile(times, 0.95) * 1000, ' '.join(heavy)))
+    return {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'repeat': repeat,
+            'results': [],
+            'imports': results}
+
+#the headless modules that import tkinter, they'd fail on a machine without it.
+def gui_imports(report):
+    return [module for module, result in report.get('imports', {}).items() if any(name in GUI_MODULES for name in result['heavy'])]
+
+#compare medians against an earlier run, returns the (engine, puzzle, ratio) of every regression.
+def compare(old_report, new_report, threshold):
+    logger = logging.getLogger(__name__)
+    old = {(r['engine'], r['class'], r['puzzle']): r for r in old_report['results']}
+    regressions = []
+    for result in new_report['results']:
+        key = (result['engine'], result['class'], result['puzzle'])
+        if key not in old or old[key]['median_s'] <= 0:
+            continue
+        ratio = result['median_s'] / old[key]['median_s']
+        if ratio > threshold:
+            regressions.append((result['engine'], result['puzzle'], ratio))
+            logger.warning("regression: %s %s is %.2fx slower (guesses %s -> %s)" % (result['engine'], result['puzzle'], ratio, old[key]['guesses'], result['guesses']))
+    old_imports = old_report.get('imports', {})
+    for module, result in new_report.get('imports', {}).items():
+        if module not in old_imports or old_imports[module]['median_s'] <= 0:
+            continue
+        ratio = result['median_s'] / old_imports[module]['median_s']
+        if ratio > threshold:
+            regressions.append(('import', module, ratio))
+            logger.warning("regression: import %s is %.2fx slower (now also imports: %s)" % (module, ratio, ' '.join(sorted(set(result['heavy']) - set(old_imports[module]['heavy']))) or 'nothing new'))
+    return regressions
+
+def setup_args(argv=None):
+    arg_parser = argparse.ArgumentParser(prog='benchmark', description='Benchmark the solver engines on the bundled puzzles.')
+    arg_parser.add_argument('--output', '-o', help='where the json report goes, default: stdout.', default='-')
+    arg_parser.add_argument('--repeat', help='timed runs per puzzle and engine, default: ' + str(DEFAULT_REPEAT) + '.', type=utils.positive_int, default=DEFAULT_REPEAT)
+    arg_parser.add_argument('--engines', help='engines to run, default: all of them.', nargs='+', choices=list(engines.ENGINES), default=list(engines.ENGINES))
+    arg_parser.add_argument('--classes', help='puzzle classes to run, default: all of them.', nargs='+', choices=list(corpus.CORPUS), default=list(corpus.CORPUS))
+    arg_parser.add_argument('--input', help='benchmark the puzzles in this text or packed file instead of the corpus.', default=None)
+    arg_parser.add_argument('--propagation', help='constraint propagation for the backtracking engine, default: ' + engine.DEFAULT_PROPAGATION + '.', choices=list(engine.PROPAGATION_LEVELS), default=engine.DEFAULT_PROPAGATION)
+    arg_parser.add_argument('--imports', help='time importing the headless modules in fresh interpreters instead of running the engines, --repeat times each.', action='store_true')
+    arg_parser.add_argument('--compare', help='earlier json report, slower medians are reported and make the exit code 1.', default=None)
+    arg_parser.add_argument('--threshold', help='slowdown ratio that counts as a regression, default: ' + str(DEFAULT_THRESHOLD) + '.', type=float, default=DEFAULT_THRESHOLD)
+    args = arg_parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    return args
+
+def main(argv=None):
+    args = setup_args(argv)
+    logger = logging.getLogger(__name__)
+    if args.imports:
+        report = run_imports(HEADLESS_MODULES, args.repeat)
+    else:
+        try:
+            report = run(args.engines, args.classes, args.propagation, args.repeat, args.input)
+        except (OSError, ValueError) as e:
+            logger.error('--input: %s' % e)
+            return 1
+
+    output_file = puzzles.open_output(args.output)
+    json.dump(report, output_file, indent=2)
+    output_file.write('\n')
+    if output_file is not sys.stdout:
+        output_file.close()
+
+    failed = False
+    for module in gui_imports(report):
+        logger.error("%s imports tkinter" % module)
+        failed = True
+    if args.compare is not None:
+        try:
+            with open(args.compare, 'r') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error('--compare: %s' % e)
+            return 1
+        if compare(baseline, report, args.threshold):
+            failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
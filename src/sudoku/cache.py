@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+
+#solution cache keyed by a canonical form of the puzzle, so that a puzzle that is only a relabelled,
+#shuffled or transposed copy of one already solved comes straight out of the cache.
+#
+#the canonical form is cheap on purpose, a true minimum over the whole symmetry group costs far
+#more than solving.  lines, bands and stacks are sorted on keys that don't depend on the digits or on
+#the order of the other axis, both orientations are tried and the digits are then renumbered in order
+#of first appearance.  that's exact for digit relabelling and repeats, and exact for the permutations
+#and transposition unless two lines tie on their keys, in which case the worst that happens is a miss.
+
+from collections import OrderedDict
+
+import sudoku.utils as utils
+import sudoku.puzzles as puzzles
+import sudoku.engine as engine
+import sudoku.engines as engines
+
+DEFAULT_CACHE_SIZE = 10000
+NO_SOLUTION = ''
+
+class Transform():
+    def __init__(self, transposed, row_order, column_order, relabel):
+        self.transposed = transposed
+        self.row_order = row_order #canonical row r is original row row_order[r] (after transposing)
+        self.column_order = column_order
+        self.relabel = relabel #original digit -> canonical digit, 0 stays 0
+
+    def apply(self, grid):
+        if self.transposed:
+            grid = transpose(grid)
+        relabel = self.relabel
+        return [[relabel[grid[r][c]] for c in self.column_order] for r in self.row_order]
+
+    def invert(self, grid):
+        size = len(grid)
+        unlabel = [0] * len(self.relabel)
+        for original, canonical in enumerate(self.relabel):
+            unlabel[canonical] = original
+        result = [[0] * size for _ in range(size)]
+        for r, original_row in enumerate(self.row_order):
+            for c, original_column in enumerate(self.column_order):
+                result[original_row][original_column] = unlabel[grid[r][c]]
+        if self.transposed:
+            result = transpose(result)
+        return result
+
+def transpose(grid):
+    return [list(column) for column in zip(*grid)]
+
+#order the lines of one axis: bands by their sorted line keys, lines within a band by their own key.
+#ties keep their original order.
+def order_lines(line_keys, block_size):
+    bands = [list(range(b * block_size, (b + 1) * block_size)) for b in range(block_size)]
+    for band in bands:
+        band.sort(key=lambda line: line_keys[line])
+    bands.sort(key=lambda band: [line_keys[line] for line in band])
+    return [line for band in bands for line in band]
+
+def orient(grid, transposed):
+    size = len(grid)
+    block_size = utils.isqrt(size)
+    if transposed:
+        grid = transpose(grid)
+
+    #invariants that survive relabelling and any reordering of rows or columns.
+    frequency = [0] * (size + 1)
+    row_counts = [0] * size
+    column_counts = [0] * size
+    for r in range(size):
+        for c in range(size):
+            if grid[r][c]:
+                frequency[grid[r][c]] += 1
+                row_counts[r] += 1
+                column_counts[c] += 1
+
+    row_keys = [(row_counts[r], sorted((column_counts[c], frequency[grid[r][c]]) for c in range(size) if grid[r][c])) for r in range(size)]
+    column_keys = [(column_counts[c], sorted((row_counts[r], frequency[grid[r][c]]) for r in range(size) if grid[r][c])) for c in range(size)]
+    row_order = order_lines(row_keys, block_size)
+    column_order = order_lines(column_keys, block_size)
+
+    #renumber digits by first appearance in the new order, the unused ones get what's left over.
+    relabel = [0] * (size + 1)
+    next_label = 1
+    for r in row_order:
+        for c in column_order:
+            value = grid[r][c]
+            if value and relabel[value] == 0:
+                relabel[value] = next_label
+                next_label += 1
+    for value in range(1, size + 1):
+        if relabel[value] == 0:
+            relabel[value] = next_label
+            next_label += 1
+
+    canonical = [[relabel[grid[r][c]] for c in column_order] for r in row_order]
+    return puzzles.format_grid(canonical), Transform(transposed, row_order, column_order, relabel)
+
+"""
+returns (canonical key, transform).  transform.apply(grid) gives the canonical grid and
+transform.invert() takes a canonical solution back to the original puzzle.
+"""
+def canonicalise(grid):
+    return min(orient(grid, False), orient(grid, True), key=lambda result: result[0])
+
+#lru bounded map from canonical key to canonical solution, optionally backed by an sqlite file that
+#keeps everything ever solved.  the file is only read on an in memory miss.
+class SolutionCache():
+    def __init__(self, maxsize = DEFAULT_CACHE_SIZE, path = None):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.db = None
+        if path is not None:
+            import sqlite3
+            self.db = sqlite3.connect(path, timeout=30)
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute('CREATE TABLE IF NOT EXISTS solutions (puzzle TEXT PRIMARY KEY, solution TEXT NOT NULL)')
+            self.db.commit()
+
+    #returns the stored solution string (NO_SOLUTION for a known dead end) or None on a miss.
+    def get(self, key):
+        solution = self.entries.get(key)
+        if solution is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return solution
+        if self.db is not None:
+            row = self.db.execute('SELECT solution FROM solutions WHERE puzzle = ?', (key,)).fetchone()
+            if row is not None:
+                self.hits += 1
+                self.remember(key, row[0])
+                return row[0]
+        self.misses += 1
+        return None
+
+    def put(self, key, solution):
+        self.remember(key, solution)
+        if self.db is not None:
+            self.db.execute('INSERT OR REPLACE INTO solutions (puzzle, solution) VALUES (?, ?)', (key, solution))
+            self.db.commit()
+
+    def remember(self, key, solution):
+        self.entries[key] = solution
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def counters(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self.entries)}
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+"""
+engines.solve with the cache in front of it.  on a miss the grid itself is solved, its canonical form
+can be a lot harder for the search, and the solution is stored in canonical form, so that it's valid
+for every puzzle that canonicalises the same way.
+stats gets 'cached' on top of what the engine writes, guesses are 0 on a hit.
+solve_fn is what runs on a miss, anything with the engines.solve signature.
+"""
+def solve(grid, cache, stats=None, engine_name=engines.DEFAULT_ENGINE, propagation=engine.DEFAULT_PROPAGATION, solve_fn=engines.solve):
+    key, transform = canonicalise(grid)
+    solution = cache.get(key)
+    if stats is not None:
+        stats['cached'] = solution is not None
+        stats['guesses'] = 0
+    if solution is None:
+        solved = solve_fn(grid, stats, engine_name, propagation)
+        cache.put(key, puzzles.format_grid(transform.apply(solved)) if solved is not None else NO_SOLUTION)
+        return solved
+    if solution == NO_SOLUTION:
+        return None
+    return transform.invert(puzzles.parse_line(solution))
+
+#boilerplate
+def main():
+    raise Exception("do not directly call this module.")
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,12 @@
 
 #constants
 DEBUG = False
-MAX_ROWS_COLUMNS=15
+#a chosen cap, not a hard one: 36x36 is the biggest board the gui and the solvers have been tried on.
+#the next size up is 49x49, which the engine's 6 bit trail digits (up to 63) would still hold; past
+#63, engine.DIGIT_BITS has to grow as well.
+MAX_ROWS_COLUMNS=36
+#how often the gui checks on a running solve.
+POLL_INTERVAL_MS=50
 
 #boilerplate
 def main():
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+#puzzles bundled with the solver, used by the gui and by the benchmark.
+
+import sudoku.puzzles as puzzles
+
+#TODO: these need to come from user input or at least a .conf file
+def get_initial_values():
+    return [[5,3,0,0,7,0,0,0,0],
+            [6,0,0,1,9,5,0,0,0],
+            [0,9,8,0,0,0,0,6,0],
+            [8,0,0,0,6,0,0,0,3],
+            [4,0,0,8,0,3,0,0,1],
+            [7,0,0,0,2,0,0,0,6],
+            [0,6,0,0,0,0,2,8,0],
+            [0,0,0,4,1,9,0,0,5],
+            [0,0,0,0,8,0,0,7,9]]
+
+def get_medium_initial_values():
+    return [[0,3,0,6,0,5,0,0,0],
+            [6,0,0,0,9,0,0,0,2],
+            [0,7,0,1,0,0,0,0,6],
+            [0,9,0,0,0,0,0,0,0],
+            [8,1,0,0,5,0,0,6,9],
+            [0,0,0,0,0,0,0,8,0],
+            [4,0,0,0,0,3,0,2,0],
+            [9,0,0,0,2,0,0,0,5],
+            [0,0,0,9,0,8,0,3,0]]
+
+def get_harder_initial_values():
+    return [[0,0,0,0,0,0,0,0,0],
+            [0,0,0,0,0,3,0,8,5],
+            [0,0,1,0,2,0,0,0,0],
+            [0,0,0,5,0,7,0,0,0],
+            [0,0,4,0,0,0,1,0,0],
+            [0,9,0,0,0,0,0,0,0],
+            [5,0,0,0,0,0,0,7,3],
+            [0,0,2,0,1,0,0,0,0],
+            [0,0,0,0,4,0,0,0,9]]
+
+#benchmark corpus, by class.  (name, puzzle line) pairs in the sudoku.puzzles text format.
+#the generated ones all have a unique solution.
+CORPUS = {
+    'easy': [('initial', puzzles.format_grid(get_initial_values())),
+             ('generated-easy-1', '....6.8......7..4...9..4356..2.53.....47.....3.8.4..........97.......6.5...2.1..3'),
+             ('generated-easy-2', '.79.....22.4....8.5..23...7.......5....69..1..8..5.2...1..287..4..7.6.95.........')],
+    'medium': [('medium', puzzles.format_grid(get_medium_initial_values())),
+               ('generated-medium-1', '83.17.........9...6......3...17.4..6.5.....2....58......2.17...5......4...842.7.1'),
+               ('generated-medium-2', '7.51......2.....8..68..9.....1.4.......6..723....7...4..2.18.7....3..5...89......')],
+    'hard': [('generated-hard-1', '96.........41...8...8.4.....2...3.74....1...3..9..6.1...3...76..8.6543........2..'),
+             ('generated-hard-2', '9...........457..95...3.1472....3...4.6.2.9....58.1.2.6............9.8....451....'),
+             ('inkala-2012', '8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..')],
+    #built to hurt backtrackers: the first is the one from get_harder_initial_values, solving its top row 987654321.
+    'adversarial': [('harder', puzzles.format_grid(get_harder_initial_values())),
+                    ('ai-escargot', '1....7.9..3..2...8..96..5....53..9...1..8...26....4...3......1..4......7..7...3..'),
+                    ('easter-monster', '1.......2.9.4...5...6...7...5.9.3.......7.......85..4.7.....6...3...9.8...2.....1')],
+    '16x16': [('generated-16-1', '.A.B.62...1..C.D123547.A.....9B.67.9.DE...4B.5A........B...A..7F...3.B.4AE..F..6D......57G62B....9A.28D...31..C...G.6.F..C..D2E3...1..A.5...E.G...7C59..F..E3B.......4B...A8.12..6BE.2.D..C3..F5.142..6C..5F9....C5....2.A...F.B7E6.BF9...G4CD51..DF..48.97.A...'),
+              ('generated-16-2', '....A2.1..G.....1.4..BFGACE.3..D.9.B8.DE.2.4..F...EG..5.89B..7.12.13.A4....D.5..FG.95.6....A.B...86.1G.7..2CDF3.EB5D.8.F..1G7.2..63725..EF...9.4..........9B1D.6.1..F....G43A....AGCD7.4...6...E3.9..F8.5...6.D....5B..CD.A....3D...E....1..8A.F.ECA....43F.B17.'),
+              ('generated-16-3', '8..4E.G.....95.21..5.6.8.AB.D.F..79.2.C.8..G....B.FG.3.D...6...C28.3B.45.C69.D.7E..6C.1.B...F953G..C7A.9.52..6.1...F.DE6.3.A2C.4.1C.6.A..F..8....9..5.D.3.8....A.F...82.....G.3.76..G4.....B..1D....D95...3...B..5.7AE6.CB.4.1....2..C.4.E17..D.F4EB.2...GA5..C.')],
+    #the big boards are there to keep an eye on how the engines scale with the size.
+    '25x25': [('generated-25-1', '1AJ.H7E..I83.5...LD..KB...34..1.9.B.MNOPCEFG.7.IJ.7.9...GHJ5AD.F.I..N..234..E..ICKLOP12..934AB.5.H.NKL.N.2..D.BG.I..78.1.....3..2..BC....F.6...8.OP...NPH6M.1..9IAD....G3K..4BC..8.J.6EKL7.CG.D.H..A3.5M5.A7OG2F..9.JM.BP...E16.KGCE....M.D..O.4.9.A.F.2H8L..H3EN..CG.7...A9J8M......698.7O.GJ.2..NBDMPH.K.EM...K8.2..NO59..1EH.D6J..OG.A1JFD.MEH..8.C5I3.9..2.J5...L....4.AMF....8B1C36..D.5.I.....B.G.OEL.4..A85NM..9.PE47L1I..3.B2.G....O...4G.N3..DK7.I..9L.81.1..93.7..CE...M.K..B.5..C....D.A...5.JO.8P19I..N...K4..D.N.M.8P..H...3....9.I..H......3C..L1.F4NE2.AN.1....F6.9.2.EI4P..C.7DE.......28...4G9.....F.6..62LD....JFN..7.3B.....OI'),
+              ('generated-25-2', '6I71..N...L..C..OHE.9.F2....5.7.FI..6..P...CDJLMNO.AB..J..O.8.IKN12456..EG.E..H.12356..A..78..PB...KK.....9C.H...BE.GIJM.456.12......6.J.578.IED.PM.H9..LN.2..9..KE..4..F.DIA.BHCE7.OG.NLDB64.K38A...21.8DKPBEM.H....OA.L1.5GN6.CF6..9.8.3..2..1M...HKO7.E3..6.....8E...2ID.GF..P57..AM7...23I.N95LBP84.1CKJN.2I..D.7.....3.H.9A.F8B..E.F1L.NA.BC.875.K3..D4.GJ..8K.IO...G......M..H..2..ID.B.......JF.4.H..ANPL.J.BH372L..A....E.......1.KC3N958PIO....AF.1.76H..4O1.F..GE.7P....KC..8.I.M.8.9.D.H4..E1LI.5.7B...JFCP..A.3..2.JM...1..IH...4I.....A..7...6K.9F...GJ.N5NF43.B9...O..CDJ76G.K1L....L2IO.K..7.EHBC......F3.....N...1.D..9.M.K..2O..')]
+}
+
+#boilerplate
+def main():
+    raise Exception("do not directly call this module.")
+if __name__ == '__main__':
+    main()
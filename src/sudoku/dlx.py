@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+#exact cover backend, knuth's algorithm x with dancing links.
+#a sudoku of size n is 4 * n * n constraints (every cell filled, every digit once per row, column
+#and block) and n * n * n candidate rows (digit d in cell i), each covering exactly four constraints.
+#the links live in flat int lists instead of node objects, which is a lot faster in python.
+#nothing in here touches tkinter either.
+
+import sudoku.utils as utils
+import sudoku.peers as peers
+
+class ExactCoverBoard():
+    #propagation is accepted so this can stand in for engine.Board, exact cover doesn't use it.
+    def __init__(self, grid, propagation = None):
+        self.size = len(grid)
+        assert all(len(row) == self.size for row in grid)
+        self.block_size = utils.isqrt(self.size)
+        self.values = [v for row in grid for v in row]
+
+        self.guesses = 0
+
+        self.build()
+        self.consistent = self.cover_givens()
+        #row nodes picked by the search, in order.
+        self.solution = []
+        #True/False once the search has finished, see search().
+        self.result = None
+        #set by skip_solution(), the next search() starts by backing out of the last row picked.
+        self.backtracking = False
+
+    def build(self):
+        size = self.size
+        cell_count = size * size
+        column_count = 4 * cell_count
+        rows, columns, blocks = peers.get_cell_units(size)
+
+        #node 0 is the root, 1..column_count are the column headers.
+        L = list(range(-1, column_count))
+        R = list(range(1, column_count + 2))
+        L[0] = column_count
+        R[column_count] = 0
+        U = list(range(column_count + 1))
+        D = list(range(column_count + 1))
+        C = list(range(column_count + 1))
+        S = [0] * (column_count + 1)
+        #for every node, the candidate it belongs to as cell * size + (digit - 1).  -1 for headers.
+        row_id = [-1] * (column_count + 1)
+
+        for i in range(cell_count):
+            for d in range(size):
+                headers = (1 + i,
+                           1 + cell_count + rows[i] * size + d,
+                           1 + 2 * cell_count + columns[i] * size + d,
+                           1 + 3 * cell_count + blocks[i] * size + d)
+                first = len(C)
+                for k, header in enumerate(headers):
+                    node = first + k
+                    L.append(first + (k - 1) % 4)
+                    R.append(first + (k + 1) % 4)
+                    U.append(U[header])
+                    D.append(header)
+                    D[U[header]] = node
+                    U[header] = node
+                    C.append(header)
+                    S[header] += 1
+                    row_id.append(i * size + d)
+
+        self.L, self.R, self.U, self.D, self.C, self.S = L, R, U, D, C, S
+        self.row_id = row_id
+
+    def cover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        R[L[c]] = R[c]
+        L[R[c]] = L[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[c]] = c
+        L[R[c]] = c
+
+    def select(self, r):
+        self.cover(self.C[r])
+        j = self.R[r]
+        while j != r:
+            self.cover(self.C[j])
+            j = self.R[j]
+
+    #the givens are just rows that are picked before the search starts.  False if two of them clash.
+    def cover_givens(self):
+        size = self.size
+        first_node = 4 * size * size + 1
+        covered = set()
+        for i, value in enumerate(self.values):
+            if value == 0:
+                continue
+            if not 1 <= value <= size:
+                return False
+            r = first_node + 4 * (i * size + value - 1)
+            headers = [self.C[r + k] for k in range(4)]
+            if any(h in covered for h in headers):
+                return False
+            covered.update(headers)
+            self.select(r)
+        return True
+
+    def solve(self):
+        return self.search()
+
+    #algorithm x, iterative so that big boards don't run into the recursion limit.
+    #always branches on the column with the fewest rows left, one guess per row tried.
+    #like engine.Board.search(), max_guesses makes it stop after that many more guesses and return None.
+    #the whole search state is the solution stack, so calling it again carries on from there.
+    def search(self, max_guesses = None):
+        if self.result is not None:
+            return self.result
+        if not self.consistent:
+            self.result = False
+            return False
+        R, D, C, S = self.R, self.D, self.C, self.S
+        solution = self.solution
+        stop_at = None if max_guesses is None else self.guesses + max_guesses
+        while True:
+            if self.backtracking:
+                self.backtracking = False
+                if len(solution) == 0:
+                    self.result = False
+                    return False
+                r = solution.pop()
+                self.unselect_rest(r)
+                c = C[r]
+                r = D[r]
+            else:
+                if R[0] == 0:
+                    self.fill_values()
+                    self.result = True
+                    return True
+                if stop_at is not None and self.guesses >= stop_at:
+                    return None
+
+                c = R[0]
+                best = S[c]
+                j = R[c]
+                while j != 0 and best > 1:
+                    if S[j] < best:
+                        c = j
+                        best = S[j]
+                    j = R[j]
+                self.cover(c)
+                r = D[c]
+
+            #walk down the column, backing up a level every time one runs out of rows.
+            while r == c:
+                self.uncover(c)
+                if len(solution) == 0:
+                    self.result = False
+                    return False
+                r = solution.pop()
+                self.unselect_rest(r)
+                c = C[r]
+                r = D[r]
+
+            self.guesses += 1
+            solution.append(r)
+            j = R[r]
+            while j != r:
+                self.cover(C[j])
+                j = R[j]
+
+    #same as engine.Board.skip_solution(): the next search() carries on to the solution after this one.
+    def skip_solution(self):
+        assert self.result is True
+        size = self.size
+        for r in self.solution:
+            self.values[self.row_id[r] // size] = 0
+        self.result = None
+        self.backtracking = True
+
+    #undo the part of a search row that solve() covered after covering its column.
+    def unselect_rest(self, r):
+        L, C = self.L, self.C
+        j = L[r]
+        while j != r:
+            self.uncover(C[j])
+            j = L[j]
+
+    def fill_values(self):
+        size = self.size
+        for r in self.solution:
+            candidate = self.row_id[r]
+            self.values[candidate // size] = candidate % size + 1
+
+    def depth(self):
+        return len(self.solution)
+
+    #the givens plus whatever the search has picked so far, values itself only gets filled at the end.
+    def partial_values(self):
+        values = list(self.values)
+        size = self.size
+        for r in self.solution:
+            candidate = self.row_id[r]
+            values[candidate // size] = candidate % size + 1
+        return values
+
+    def to_grid(self):
+        return [self.values[r * self.size:(r + 1) * self.size] for r in range(self.size)]
+
+"""
+same contract as engine.solve: a 0 filled grid in, the solved grid or None out.
+"""
+def solve(grid, stats=None, propagation=None):
+    board = ExactCoverBoard(grid)
+    solved = board.solve()
+    if stats is not None:
+        stats['guesses'] = board.guesses
+    return board.to_grid() if solved else None
+
+#boilerplate
+def main():
+    raise Exception("do not directly call this module.")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+
+#headless solver.  nothing in here touches tkinter, so it can run in batch jobs without a Tk root.
+#the board is a flat, row major list of cell values (0 is empty) plus one bitmask per row, column
+#and block of the digits already used there.  bit d set means digit d is taken.
+
+import sudoku.utils as utils
+import sudoku.peers as peers
+import sudoku.structs as structs
+
+#propagation levels, each one includes everything below it.
+PROPAGATION_NONE = 0
+PROPAGATION_NAKED_SINGLES = 1
+PROPAGATION_HIDDEN_SINGLES = 2
+PROPAGATION_LOCKED_CANDIDATES = 3
+PROPAGATION_LEVELS = {'none': PROPAGATION_NONE,
+                      'naked': PROPAGATION_NAKED_SINGLES,
+                      'hidden': PROPAGATION_HIDDEN_SINGLES,
+                      'locked': PROPAGATION_LOCKED_CANDIDATES}
+DEFAULT_PROPAGATION = 'locked'
+
+#the trail is a flat list of ints, one per change made to the board since it was loaded.
+#removing digit d from cell i is (i << DIGIT_BITS) | d, placing it is the bitwise not of that.
+#digits go up to 36, which fits in 6 bits.
+DIGIT_BITS = 6
+DIGIT_MASK = (1 << DIGIT_BITS) - 1
+
+class Board():
+    def __init__(self, grid, propagation = DEFAULT_PROPAGATION):
+        self.size = len(grid)
+        assert all(len(row) == self.size for row in grid)
+        self.block_size = utils.isqrt(self.size)
+        #bits 1..size, bit zero is never used so a digit is its own bit index.
+        self.full_mask = ((1 << self.size) - 1) << 1
+
+        self.values = [v for row in grid for v in row]
+        #shared, per size lookup tables.  never mutate these.
+        self.rows, self.columns, self.blocks = peers.get_cell_units(self.size)
+        self.peers = peers.get_peers(self.size)
+        self.units = peers.get_units(self.size)
+        self.intersections = peers.get_intersections(self.size)
+
+        self.row_masks = [0] * self.size
+        self.column_masks = [0] * self.size
+        self.block_masks = [0] * self.size
+
+        #a board with two equal givens in a unit has no solution, remember that instead of raising
+        #so that solve() can just answer None like any other dead end.
+        self.consistent = True
+        for i, value in enumerate(self.values):
+            if value == 0:
+                continue
+            if not 1 <= value <= self.size or not self.candidates_mask(i) & (1 << value):
+                self.consistent = False
+            self.place(i, value)
+
+        #per cell candidate masks, only meaningful for empty cells.  worked out once from the unit masks
+        #and then kept up to date by mark_chosen/mark_unchosen, which only ever visit a cell's peers.
+        self.choices = [self.candidates_mask(i) if value == 0 else 0 for i, value in enumerate(self.values)]
+        #empties bucketed by candidate count, so guess() can grab the most constrained one straight away.
+        self.buckets = structs.CandidateBuckets(self.size)
+        for i in self.empties():
+            self.buckets.add(i, utils.popcount(self.choices[i]))
+
+        self.propagation = PROPAGATION_LEVELS[propagation]
+        self.trail = []
+
+        #search() state, see there.
+        self.stack = []
+        self.tried = False
+        self.started = False
+        self.result = None
+
+        self.guesses = 0
+
+    def candidates_mask(self, i):
+        return self.full_mask & ~(self.row_masks[self.rows[i]] | self.column_masks[self.columns[i]] | self.block_masks[self.blocks[i]])
+
+    def place(self, i, value):
+        bit = 1 << value
+        self.values[i] = value
+        self.row_masks[self.rows[i]] |= bit
+        self.column_masks[self.columns[i]] |= bit
+        self.block_masks[self.blocks[i]] |= bit
+
+    def unplace(self, i, value):
+        bit = ~(1 << value)
+        self.values[i] = 0
+        self.row_masks[self.rows[i]] &= bit
+        self.column_masks[self.columns[i]] &= bit
+        self.block_masks[self.blocks[i]] &= bit
+
+    #returns False when the cell has nothing left, the caller has to back out.
+    def eliminate(self, i, value):
+        choices = self.choices[i]
+        count = utils.popcount(choices)
+        self.choices[i] = choices ^ (1 << value)
+        self.buckets.move(i, count, count - 1)
+        self.trail.append((i << DIGIT_BITS) | value)
+        return count > 1
+
+    #place a value and take it away from every empty peer.  returns False if a peer runs dry.
+    def assign(self, i, value):
+        self.buckets.remove(i, utils.popcount(self.choices[i]))
+        self.place(i, value)
+        self.trail.append(~((i << DIGIT_BITS) | value))
+
+        bit = 1 << value
+        values = self.values
+        choices = self.choices
+        for p in self.peers[i]:
+            if values[p] == 0 and choices[p] & bit:
+                if not self.eliminate(p, value):
+                    return False
+        return True
+
+    #these next two are the heart of the entire algorithm
+    #in mark chosen, we place our new choice, remove it from all of our empty peers and let propagation take
+    #whatever follows from that.  every change lands on the trail in case our choice doesn't work out.
+    def mark_chosen(self, i, value):
+        return self.assign(i, value) and self.propagate()
+
+    #in mark_unchosen, we've failed to recurse at some point and need to take back everything after the mark.
+    def mark_unchosen(self, mark):
+        trail = self.trail
+        choices = self.choices
+        buckets = self.buckets
+        while len(trail) > mark:
+            entry = trail.pop()
+            if entry < 0:
+                entry = ~entry
+                i = entry >> DIGIT_BITS
+                self.unplace(i, entry & DIGIT_MASK)
+                buckets.add(i, utils.popcount(choices[i]))
+            else:
+                i = entry >> DIGIT_BITS
+                count = utils.popcount(choices[i])
+                choices[i] |= 1 << (entry & DIGIT_MASK)
+                buckets.move(i, count, count + 1)
+
+    #apply the configured techniques until none of them changes anything.  False on a contradiction.
+    def propagate(self):
+        level = self.propagation
+        if level == PROPAGATION_NONE:
+            return True
+        buckets = self.buckets.buckets
+        while True:
+            if buckets[0]:
+                return False
+            #naked singles: cells with exactly one choice left.
+            if buckets[1]:
+                i = next(iter(buckets[1]))
+                if not self.assign(i, self.choices[i].bit_length() - 1):
+                    return False
+                continue
+            if level < PROPAGATION_HIDDEN_SINGLES:
+                return True
+            found = self.find_hidden_single()
+            if found is None:
+                return False
+            if found:
+                continue
+            if level < PROPAGATION_LOCKED_CANDIDATES:
+                return True
+            found = self.eliminate_locked_candidates()
+            if found is None:
+                return False
+            if not found:
+                return True
+
+    #hidden singles: a digit that only one cell of a unit can still take.  places the first one found.
+    #returns True if it placed something, False if there was nothing to do, None on a contradiction.
+    def find_hidden_single(self):
+        values = self.values
+        choices = self.choices
+        full_mask = self.full_mask
+        for unit in self.units:
+            once = twice = placed = 0
+            for i in unit:
+                value = values[i]
+                if value:
+                    placed |= 1 << value
+                else:
+                    m = choices[i]
+                    twice |= once & m
+                    once |= m
+            if (once | placed) != full_mask:
+                return None #some digit has nowhere left to go in this unit.
+            hidden = once & ~twice & ~placed
+            if hidden:
+                bit = hidden & -hidden
+                for i in unit:
+                    if values[i] == 0 and choices[i] & bit:
+                        return self.assign(i, bit.bit_length() - 1) or None
+        return False
+
+    #locked candidates: a digit confined to where a block and a line cross can't go anywhere else in the
+    #line (pointing) or anywhere else in the block (claiming).
+    #returns True if anything was eliminated, False if not, None on a contradiction.
+    def eliminate_locked_candidates(self):
+        values = self.values
+        choices = self.choices
+        found = False
+        for segment, line_rest, block_rest in self.intersections:
+            segment_mask = 0
+            for i in segment:
+                if values[i] == 0:
+                    segment_mask |= choices[i]
+            if segment_mask == 0:
+                continue
+            line_mask = 0
+            for i in line_rest:
+                if values[i] == 0:
+                    line_mask |= choices[i]
+            block_mask = 0
+            for i in block_rest:
+                if values[i] == 0:
+                    block_mask |= choices[i]
+            pointing = segment_mask & ~block_mask & line_mask
+            claiming = segment_mask & ~line_mask & block_mask
+            for mask, rest in ((pointing, line_rest), (claiming, block_rest)):
+                for value in utils.mask_digits(mask):
+                    bit = 1 << value
+                    for i in rest:
+                        if values[i] == 0 and choices[i] & bit:
+                            found = True
+                            if not self.eliminate(i, value):
+                                return None
+        return found
+
+    def empties(self):
+        return [i for i, value in enumerate(self.values) if value == 0]
+
+    #propagate from the givens once, then search.
+    def solve(self):
+        return self.search()
+
+    #the most constrained empty cell, -1 once there are none left.
+    def choose_cell(self):
+        if len(self.buckets) == 0:
+            return -1
+        return self.buckets.minimum()[0]
+
+    #the recursive form of the search: take the empty cell with the fewest choices, try each of its
+    #choices in ascending order, one guess per try.  search() below does exactly the same without
+    #recursing, this one is kept as the reference for it.  expects the root propagation done already.
+    #guess counts don't match the old button based guess().  that one tried a cell's choices in set
+    #iteration order, and it took the chosen cell out of its empties list and put it back at the end
+    #around every try, which moved it behind other cells with the same number of choices.  ascending
+    #digits and a fixed tie break took the bundled medium puzzle from 519 to 630 guesses and the harder
+    #one from 11061 to 13697; the tie break alone only gets back to 604 and 11440.  the candidate
+    #buckets changed the tie break again, with propagation 'none' it's 466 and 4662 now.
+    def guess(self):
+        chosen_empty = self.choose_cell()
+        if chosen_empty < 0:
+            return True #all done, the remaining values are filled.
+
+        for c in utils.mask_digits(self.choices[chosen_empty]):
+            self.guesses += 1
+
+            mark = len(self.trail)
+            if self.mark_chosen(chosen_empty, c) and self.guess():
+                return True #start unwinding
+            self.mark_unchosen(mark)
+
+        #if we make it here then one of the previous values was invalid.  start unwinding.
+        return False
+
+    #open a search node on the most constrained cell.  False if there's nothing left to fill.
+    def push_node(self):
+        cell = self.choose_cell()
+        if cell < 0:
+            return False
+        self.stack.append(cell)
+        self.stack.append(self.choices[cell])
+        self.stack.append(len(self.trail))
+        self.tried = False
+        return True
+
+    #guess() without the recursion, so it can't hit the recursion limit and doesn't pay for a frame per node.
+    #the search state is all on the board: a flat stack of (cell, choices not tried yet, trail mark) per
+    #open node, the trail, and whether the top node's last choice still has to be taken back.
+    #with max_guesses it stops after that many more guesses and returns None, calling it again picks up
+    #exactly where it stopped.  otherwise True for solved, False for no solution.
+    def search(self, max_guesses = None):
+        if self.result is not None:
+            return self.result
+        stack = self.stack
+        if not self.started:
+            self.started = True
+            if not self.consistent or not self.propagate():
+                self.result = False
+                return False
+            if not self.push_node():
+                self.result = True
+                return True
+
+        stop_at = None if max_guesses is None else self.guesses + max_guesses
+        while True:
+            cell = stack[-3]
+            remaining = stack[-2]
+            if self.tried:
+                self.mark_unchosen(stack[-1])
+                self.tried = False
+            if remaining == 0:
+                #out of choices here, so the choice that got us here was wrong too.
+                del stack[-3:]
+                if len(stack) == 0:
+                    self.result = False
+                    return False
+                self.tried = True
+                continue
+            if stop_at is not None and self.guesses >= stop_at:
+                return None
+
+            bit = remaining & -remaining
+            stack[-2] = remaining ^ bit
+            self.guesses += 1
+
+            self.tried = True
+            if self.mark_chosen(cell, bit.bit_length() - 1) and not self.push_node():
+                self.result = True
+                return True
+
+    #after search() has found a solution, drop it so the next search() carries on to the one after.
+    #values holds the solution until then, so copy it out first.
+    def skip_solution(self):
+        assert self.result is True
+        #solved without a single guess means there's nothing else to try.
+        self.result = None if len(self.stack) else False
+
+    #how many guesses deep search() is, three ints per open node on its stack.
+    def depth(self):
+        return len(self.stack) // 3
+
+    #a copy of the board as the search has it right now.
+    def partial_values(self):
+        return list(self.values)
+
+    def to_grid(self):
+        return [self.values[r * self.size:(r + 1) * self.size] for r in range(self.size)]
+
+"""
+solve a 0 filled grid (list of rows), returns the solved grid or None if there isn't a solution.
+the grid passed in is left alone.  if stats is a dict, the guess count is written into it.
+propagation is one of the PROPAGATION_LEVELS names.
+"""
+def solve(grid, stats=None, propagation=DEFAULT_PROPAGATION):
+    board = Board(grid, propagation)
+    solved = board.solve()
+    if stats is not None:
+        stats['guesses'] = board.guesses
+    return board.to_grid() if solved else None
+
+"""
+up to limit solutions of a board, as grids.  the search carries on from each solution to the next
+one, so it shares the board's propagation and trail and stops as soon as it has limit of them.
+works on any board with search() and skip_solution().
+"""
+def find_solutions(board, limit):
+    solutions = []
+    while len(solutions) < limit and board.search():
+        solutions.append(board.to_grid())
+        if len(solutions) < limit:
+            board.skip_solution()
+    return solutions
+
+"""
+how many solutions the grid has, counting stops at limit.  with the default of 2 that's 0 for none,
+1 for a proper puzzle and 2 for more than one.  stats gets the guess count, same as solve().
+"""
+def count_solutions(grid, limit=2, stats=None, propagation=DEFAULT_PROPAGATION):
+    board = Board(grid, propagation)
+    count = len(find_solutions(board, limit))
+    if stats is not None:
+        stats['guesses'] = board.guesses
+    return count
+
+#boilerplate
+def main():
+    raise Exception("do not directly call this module.")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+#the solver backends by name.  each one is a board class taking (grid, propagation) with solve(),
+#search() and skip_solution() methods, a guesses count and to_grid(), so callers don't care which one
+#they got.
+
+import sudoku.engine as engine
+import sudoku.dlx as dlx
+
+ENGINES = {'backtrack': engine.Board,
+           'dlx': dlx.ExactCoverBoard}
+DEFAULT_ENGINE = 'backtrack'
+
+"""
+solve a 0 filled grid with the named engine, returns the solved grid or None.
+if stats is a dict, the guess count is written into it.
+"""
+def solve(grid, stats=None, engine_name=DEFAULT_ENGINE, propagation=engine.DEFAULT_PROPAGATION):
+    board = ENGINES[engine_name](grid, propagation)
+    solved = board.solve()
+    if stats is not None:
+        stats['guesses'] = board.guesses
+    return board.to_grid() if solved else None
+
+"""
+up to limit solutions of the grid with the named engine, as a list of grids.  stats as for solve().
+"""
+def solutions(grid, limit=2, stats=None, engine_name=DEFAULT_ENGINE, propagation=engine.DEFAULT_PROPAGATION):
+    board = ENGINES[engine_name](grid, propagation)
+    found = engine.find_solutions(board, limit)
+    if stats is not None:
+        stats['guesses'] = board.guesses
+    return found
+
+#boilerplate
+def main():
+    raise Exception("do not directly call this module.")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+#puzzle generator: python3 -m sudoku.generator --count 1000 [--difficulty hard] [--seed 1] [-o puzzles.txt]
+#every puzzle starts from a random complete grid and has its clues taken away one at a time, in random
+#order, as long as the solution stays unique.  the result is graded by how much the solver needs to
+#solve it and written out in the sudoku.puzzles text format, so it can go straight into solve-batch.
+#puzzle i of a run only depends on the seed and i, so the same seed gives the same file with any
+#number of workers.
+
+import sys, logging, argparse, os, time, random
+from functools import partial
+
+import sudoku.utils as utils
+import sudoku.puzzles as puzzles
+import sudoku.engine as engine
+import sudoku.cache as cache
+from sudoku.utils import positive_int
+
+#a puzzle gets the first grade whose propagation solves it without a single guess.  expert is
+#everything that still needs guessing after locked candidates.
+GRADES = [('easy', 'naked'),
+          ('medium', 'hidden'),
+          ('hard', 'locked')]
+EXPERT = 'expert'
+DIFFICULTIES = [difficulty for difficulty, propagation in GRADES] + [EXPERT]
+DEFAULT_COUNT = 100
+DEFAULT_SIZE = 9
+#puzzles made and thrown away looking for one of the asked for difficulty, before giving up on it.
+DEFAULT_MAX_ATTEMPTS = 200
+
+#the rows (or columns) in a random order that keeps every band (or stack) together.
+def shuffled_lines(size, rnd):
+    block_size = utils.isqrt(size)
+    return [band * block_size + line for band in rnd.sample(range(block_size), block_size) for line in rnd.sample(range(block_size), block_size)]
+
+#a random symmetry of the grid: relabelled digits, lines shuffled within their bands and stacks,
+#bands and stacks shuffled, maybe transposed.  none of that changes whether a grid is valid.
+def random_transform(size, rnd):
+    relabel = [0] + rnd.sample(range(1, size + 1), size)
+    return cache.Transform(rnd.random() < 0.5, shuffled_lines(size, rnd), shuffled_lines(size, rnd), relabel)
+
+def random_solution(size, rnd):
+    block_size = utils.isqrt(size)
+    while True:
+        #the blocks on the diagonal share no unit, so any fill of them is consistent.
+        grid = [[0] * size for _ in range(size)]
+        for b in range(block_size):
+            for k, value in enumerate(rnd.sample(range(1, size + 1), size)):
+                grid[b * block_size + k // block_size][b * block_size + k % block_size] = value
+        solution = engine.solve(grid)
+        if solution is not None:
+            #the solver always fills the rest in the same way, the shuffle takes care of that.
+            return random_transform(size, rnd).apply(solution)
+
+#take clues away in random order while the puzzle stays unique, down to clues of them (0 for as few as
+#this order allows).
+def remove_clues(solution, rnd, clues=0):
+    size = len(solution)
+    grid = [row[:] for row in solution]
+    remaining = size * size
+    for i in rnd.sample(range(size * size), size * size):
+        if remaining <= clues:
+            break
+        r, c = divmod(i, size)
+        value = grid[r][c]
+        grid[r][c] = 0
+        if engine.count_solutions(grid) == 1:
+            remaining -= 1
+        else:
+            grid[r][c] = value
+    return grid
+
+"""
+grade a puzzle with a unique solution, returns (difficulty, guesses).  guesses is what the solver
+needed with full propagation, only ever more than 0 for expert puzzles.
+"""
+def grade(grid):
+    stats = {}
+    for difficulty, propagation in GRADES:
+        engine.solve(grid, stats, propagation)
+        if stats['guesses'] == 0:
+            return difficulty, 0
+    return EXPERT, stats['guesses']
+
+"""
+one puzzle from the seed, of the given difficulty if one is given.  returns (grid, difficulty, guesses,
+attempts), grid is None if max_attempts puzzles in a row came out at some other difficulty.
+"""
+def generate(size, seed, difficulty=None, clues=0, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    rnd = random.Random(seed)
+    for attempt in range(1, max_attempts + 1):
+        grid = remove_clues(random_solution(size, rnd), rnd, clues)
+        grid_difficulty, guesses = grade(grid)
+        if difficulty is None or grid_difficulty == difficulty:
+            return grid, grid_difficulty, guesses, attempt
+    return None, None, None, max_attempts
+
+#runs in the worker processes, returns the output line (None if it gave up) and the grade.
+def generate_line(size, difficulty, clues, max_attempts, seed):
+    grid, grid_difficulty, guesses, attempts = generate(size, seed, difficulty, clues, max_attempts)
+    return (puzzles.format_grid(grid) if grid is not None else None), grid_difficulty, guesses, attempts
+
+def generate_stream(seeds, size, difficulty, clues, max_attempts, workers):
+    generate_fn = partial(generate_line, size, difficulty, clues, max_attempts)
+    if workers == 1:
+        yield from map(generate_fn, seeds)
+        return
+    import multiprocessing
+    with multiprocessing.Pool(workers) as pool:
+        #in order, so the file comes out the same whatever the number of workers.
+        yield from pool.imap(generate_fn, seeds)
+
+def size_type(x):
+    x = int(x)
+    if utils.isqrt(x, raiseOnError=False) == -1 or not 4 <= x <= len(puzzles.DIGITS):
+        raise argparse.ArgumentTypeError("Must be a perfect square from 4 to " + str(len(puzzles.DIGITS)) + ".")
+    return x
+
+def setup_args(argv=None):
+    arg_parser = argparse.ArgumentParser(prog='generate', description='Generate sudokus with a unique solution, one per line.')
+    arg_parser.add_argument('--count', '-n', help='puzzles to generate, default: ' + str(DEFAULT_COUNT) + '.', type=positive_int, default=DEFAULT_COUNT)
+    arg_parser.add_argument('--output', '-o', help='where the puzzles go, default: stdout.', default='-')
+    arg_parser.add_argument('--size', help='rows in the board, default: ' + str(DEFAULT_SIZE) + '.', type=size_type, default=DEFAULT_SIZE)
+    arg_parser.add_argument('--difficulty', help='only keep puzzles of this grade, default: whatever comes out.', choices=DIFFICULTIES, default=None)
+    arg_parser.add_argument('--clues', help='stop taking clues away at this many, much quicker for big boards, default: 0 (as few as possible).', type=int, default=0)
+    arg_parser.add_argument('--max-attempts', help='puzzles tried per output line when a difficulty is asked for, default: ' + str(DEFAULT_MAX_ATTEMPTS) + '.', type=positive_int, default=DEFAULT_MAX_ATTEMPTS)
+    arg_parser.add_argument('--seed', help='makes the run reproducible, default: a random one, logged.', default=None)
+    arg_parser.add_argument('--workers', help='number of worker processes, default: one per cpu.', type=positive_int, default=os.cpu_count() or 1)
+    arg_parser.add_argument('--debug', help='turn on debugging information', action='store_true')
+    args = arg_parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO, stream=sys.stderr)
+    return args
+
+def main(argv=None):
+    args = setup_args(argv)
+    logger = logging.getLogger(__name__)
+
+    seed = args.seed if args.seed is not None else str(random.SystemRandom().getrandbits(32))
+    logger.info("seed: %s" % seed)
+    seeds = ('%s:%s' % (seed, i) for i in range(args.count))
+
+    count = attempts = 0
+    grades = {}
+    start_time = time.perf_counter()
+    output_file = puzzles.open_output(args.output)
+    try:
+        for line, difficulty, guesses, puzzle_attempts in generate_stream(seeds, args.size, args.difficulty, args.clues, args.max_attempts, args.workers):
+            attempts += puzzle_attempts
+            if line is None:
+                logger.warning("no %s puzzle in %s attempts, skipped" % (args.difficulty, puzzle_attempts))
+                continue
+            output_file.write(line + '\n')
+            count += 1
+            grades[difficulty] = grades.get(difficulty, 0) + 1
+            logger.debug("%s %s guesses: %s" % (line, difficulty, guesses))
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+        else:
+            output_file.flush()
+    elapsed = time.perf_counter() - start_time
+
+    rate = count / elapsed if elapsed > 0 else 0.0
+    logger.info("%s puzzles (%s made) in %.3fs: %.1f puzzles/s, %.1f puzzles/s per worker" % (count, attempts, elapsed, rate, rate / args.workers))
+    logger.info("grades: %s" % grades)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
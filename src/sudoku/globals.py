@@ -1,7 +1,19 @@
 #!/usr/bin/env python3
 
 total_guesses = 0
-refresh_ui_time = 0.0 
+#the running worker.SolveWorker, None when nothing is being solved.
+solve_worker = None
+#buttons that are greyed out while a solve runs, and the one that isn't.
+action_buttons = []
+cancel_button = None
+#the loaded puzzles (grids), which one is on the board, and the "Puzzle i of n" text.
+puzzles = []
+puzzle_index = 0
+puzzle_position = None
+#the < and > buttons, only enabled when there's a puzzle that way.
+step_buttons = []
+#the block frames of the board, so a board of another size can replace them.
+board_frames = []
 
 #boilerplate
 def main():
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+#opt in instrumentation for the engines.
+#the counters live on subclasses of the engine boards, so a normal solve runs the plain classes and
+#pays nothing for them.  profiling is cProfile around a block, written out as a pstats file.
+
+import logging, time
+from contextlib import contextmanager
+
+import sudoku.engine as engine
+import sudoku.dlx as dlx
+
+COUNTERS = ('guesses', 'nodes', 'backtracks', 'max_depth', 'placements', 'eliminations', 'setup_s', 'search_s')
+
+class InstrumentedBoard(engine.Board):
+    def __init__(self, grid, propagation = engine.DEFAULT_PROPAGATION):
+        self.nodes = self.backtracks = self.max_depth = 0
+        self.placements = self.eliminations = 0
+        start_time = time.perf_counter()
+        super().__init__(grid, propagation)
+        self.setup_s = time.perf_counter() - start_time
+        self.search_s = 0.0
+
+    #search() can be run in chunks (the gui does), so the time adds up over the calls.
+    def search(self, max_guesses = None):
+        start_time = time.perf_counter()
+        try:
+            return super().search(max_guesses)
+        finally:
+            self.search_s += time.perf_counter() - start_time
+
+    #every node of the search tree is opened by choose_cell(), one level below the ones already open.
+    def choose_cell(self):
+        self.nodes += 1
+        depth = self.depth() + 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return super().choose_cell()
+
+    def assign(self, i, value):
+        self.placements += 1
+        return super().assign(i, value)
+
+    def eliminate(self, i, value):
+        self.eliminations += 1
+        return super().eliminate(i, value)
+
+    def mark_unchosen(self, mark):
+        self.backtracks += 1
+        super().mark_unchosen(mark)
+
+class InstrumentedExactCoverBoard(dlx.ExactCoverBoard):
+    def __init__(self, grid, propagation = None):
+        self.backtracks = self.max_depth = 0
+        start_time = time.perf_counter()
+        super().__init__(grid, propagation)
+        self.setup_s = time.perf_counter() - start_time
+        self.search_s = 0.0
+
+    def search(self, max_guesses = None):
+        start_time = time.perf_counter()
+        try:
+            return super().search(max_guesses)
+        finally:
+            self.search_s += time.perf_counter() - start_time
+            #every row picked is a node, the solution stack is as deep as the search got at the end.
+            self.nodes = self.guesses
+            self.max_depth = max(self.max_depth, len(self.solution))
+            self.placements = len(self.solution)
+            self.eliminations = 0
+
+    def unselect_rest(self, r):
+        self.backtracks += 1
+        self.max_depth = max(self.max_depth, len(self.solution) + 1)
+        super().unselect_rest(r)
+
+INSTRUMENTED_ENGINES = {'backtrack': InstrumentedBoard,
+                        'dlx': InstrumentedExactCoverBoard}
+
+"""
+engines.solve, but stats (if given) gets every counter in COUNTERS.
+"""
+def solve(grid, stats=None, engine_name='backtrack', propagation=engine.DEFAULT_PROPAGATION):
+    board = INSTRUMENTED_ENGINES[engine_name](grid, propagation)
+    solved = board.solve()
+    if stats is not None:
+        for counter in COUNTERS:
+            stats[counter] = getattr(board, counter)
+    return board.to_grid() if solved else None
+
+#engines.solutions, with the counters.
+def solutions(grid, limit=2, stats=None, engine_name='backtrack', propagation=engine.DEFAULT_PROPAGATION):
+    board = INSTRUMENTED_ENGINES[engine_name](grid, propagation)
+    found = engine.find_solutions(board, limit)
+    if stats is not None:
+        for counter in COUNTERS:
+            stats[counter] = getattr(board, counter)
+    return found
+
+#add up the counters of several solves, max_depth is the deepest of them.
+def add_counters(total, stats):
+    for counter in COUNTERS:
+        if counter == 'max_depth':
+            total[counter] = max(total.get(counter, 0), stats[counter])
+        else:
+            total[counter] = total.get(counter, 0) + stats[counter]
+    return total
+
+"""
+profile the block with cProfile and write the pstats file to path.  does nothing when path is None,
+so callers can wrap unconditionally.
+"""
+@contextmanager
+def profiled(path):
+    if path is None:
+        yield
+        return
+    import cProfile
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
+        logging.getLogger(__name__).info("profile written to %s, read it with python3 -m pstats %s" % (path, path))
+
+#boilerplate
+def main():
+    raise Exception("do not directly call this module.")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+#load test for sudoku.service: python3 -m sudoku.loadtest [puzzles.txt] [--concurrency N] [--requests N]
+#keeps --concurrency keep-alive connections busy with POST /solve, cycling through the puzzles, and logs
+#the latency percentiles, the answers by status and the requests/s it got.  the server's own /metrics
+#is logged at the end as well.  without a puzzle file it uses the benchmark corpus.
+#--duplicates N sends every puzzle N times in a row, so up to N connections ask for the same puzzle at
+#about the same time, which is what the server's coalescing is for.
+#standard library only, same as the service.
+
+import sys, logging, argparse, time, json, asyncio, itertools, urllib.parse
+
+import sudoku.puzzles as puzzles
+import sudoku.corpus as corpus
+from sudoku.utils import positive_int
+
+DEFAULT_URL = 'http://127.0.0.1:8080'
+DEFAULT_CONCURRENCY = 16
+DEFAULT_REQUESTS = 1000
+DEFAULT_DUPLICATES = 1
+
+class Connection():
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body = None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = b'' if body is None else json.dumps(body).encode()
+        self.writer.write(('%s %s HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\nContent-Length: %s\r\n\r\n'
+                           % (method, path, self.host, len(data))).encode('latin-1') + data)
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('the server closed the connection')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        answer = json.loads(await self.reader.readexactly(int(headers['content-length'])))
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, answer
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+def percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else 0.0
+
+async def run(url, lines, concurrency, request_count, timeout, check_unique, duplicates = DEFAULT_DUPLICATES):
+    logger = logging.getLogger(__name__)
+    parts = urllib.parse.urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    next_line = itertools.cycle([line for line in lines for _ in range(duplicates)])
+    sent = itertools.count()
+    latencies = []
+    statuses = {}
+    coalesced = 0
+
+    async def client():
+        nonlocal coalesced
+        connection = Connection(host, port)
+        try:
+            while next(sent) < request_count:
+                body = {'puzzle': next(next_line), 'check_unique': check_unique}
+                if timeout is not None:
+                    body['timeout'] = timeout
+                start_time = time.perf_counter()
+                status, answer = await connection.request('POST', '/solve', body)
+                latencies.append(time.perf_counter() - start_time)
+                key = answer.get('status', '%s %s' % (status, answer.get('error')))
+                statuses[key] = statuses.get(key, 0) + 1
+                coalesced += answer.get('coalesced', False)
+        finally:
+            connection.close()
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start_time
+
+    latencies.sort()
+    ms = lambda seconds: '%.2fms' % (seconds * 1000)
+    logger.info("%s requests on %s connections in %.3fs: %.1f requests/s" % (len(latencies), concurrency, elapsed, len(latencies) / elapsed if elapsed > 0 else 0.0))
+    logger.info("latency p50 %s  p90 %s  p99 %s  max %s" % (ms(percentile(latencies, 0.5)), ms(percentile(latencies, 0.9)), ms(percentile(latencies, 0.99)), ms(latencies[-1] if latencies else 0.0)))
+    logger.info("answers: %s, coalesced: %s" % (statuses, coalesced))
+
+    connection = Connection(host, port)
+    try:
+        status, metrics = await connection.request('GET', '/metrics')
+    finally:
+        connection.close()
+    logger.info("server metrics: %s" % json.dumps(metrics))
+
+def setup_args(argv=None):
+    arg_parser = argparse.ArgumentParser(prog='loadtest', description='Load test a running sudoku.service.')
+    arg_parser.add_argument('input', help="puzzle file to send, one puzzle per line, '-' reads stdin.  default: every puzzle of the benchmark corpus.", nargs='?', default=None)
+    arg_parser.add_argument('--url', help='where the service is, default: ' + DEFAULT_URL + '.', default=DEFAULT_URL)
+    arg_parser.add_argument('--concurrency', '-c', help='connections sending requests at the same time, default: ' + str(DEFAULT_CONCURRENCY) + '.', type=positive_int, default=DEFAULT_CONCURRENCY)
+    arg_parser.add_argument('--requests', '-n', help='requests to send in all, default: ' + str(DEFAULT_REQUESTS) + '.', type=positive_int, default=DEFAULT_REQUESTS)
+    arg_parser.add_argument('--duplicates', help='times every puzzle is sent in a row, more than 1 exercises the coalescing, default: ' + str(DEFAULT_DUPLICATES) + '.', type=positive_int, default=DEFAULT_DUPLICATES)
+    arg_parser.add_argument('--timeout', help="seconds per request, default: the server's.", type=float, default=None)
+    arg_parser.add_argument('--check-unique', help='ask the server to check every puzzle for a second solution.', action='store_true')
+    arg_parser.add_argument('--debug', help='turn on debugging information', action='store_true')
+    args = arg_parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO, stream=sys.stderr)
+    return args
+
+def main(argv=None):
+    args = setup_args(argv)
+    logger = logging.getLogger(__name__)
+    if args.input is None:
+        lines = [line for puzzle_class in corpus.CORPUS.values() for name, line in puzzle_class]
+    else:
+        input_file = puzzles.open_input(args.input)
+        try:
+            lines = [line for line_number, line in puzzles.read_lines(input_file)]
+        finally:
+            if input_file is not sys.stdin:
+                input_file.close()
+        if not lines:
+            logger.error('no puzzles in %s' % args.input)
+            return 1
+    try:
+        asyncio.run(run(args.url, lines, args.concurrency, args.requests, args.timeout, args.check_unique, args.duplicates))
+    except (OSError, ValueError) as e:
+        logger.error('%s: %s' % (args.url, e))
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
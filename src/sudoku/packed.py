@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+
+#packed binary puzzle files, for corpora big enough that reading text is what takes the time.
+#python3 -m sudoku.packed pack puzzles.txt puzzles.sdk [--solve] / unpack puzzles.sdk puzzles.txt
+#
+#a 16 byte header, then count fixed size records:
+#    header: magic 'SDKB', version, board size, bits per cell, flags, record count (8 bytes), little endian.
+#    record: the puzzle's cells, row major, bits per cell each, first cell in the highest bits, padded
+#            to a whole byte.  4 bits per cell up to 9x9, 5 up to 25x25, 6 for 36x36.
+#            then, with FLAG_SOLUTIONS, the solution the same way (all zero if there isn't one),
+#            then, with FLAG_STATS, the guesses the solver took as 4 bytes.
+#the reader maps the file and hands out memoryview slices of it, so nothing is read or copied until a
+#puzzle is unpacked, and a file of any length costs the same memory to go through.
+
+import sys, logging, argparse, mmap, struct
+
+import sudoku.puzzles as puzzles
+import sudoku.engine as engine
+import sudoku.engines as engines
+from sudoku.puzzles import NO_SOLUTION
+
+MAGIC = b'SDKB'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBBQ')
+COUNT_OFFSET = 8
+STATS = struct.Struct('<I')
+FLAG_SOLUTIONS = 1
+FLAG_STATS = 2
+#hex digits to the nibbles they stand for, the fast way through 4 bit cells.
+NIBBLES = bytes.maketrans(b'0123456789abcdef', bytes(range(16)))
+
+def get_bits(size):
+    return max(4, size.bit_length())
+
+def get_cell_bytes(size):
+    return (size * size * get_bits(size) + 7) // 8
+
+def pack_grid(grid, bits):
+    packed = 0
+    cell_count = 0
+    for row in grid:
+        for value in row:
+            packed = (packed << bits) | value
+            cell_count += 1
+    padding = -(cell_count * bits) % 8
+    return (packed << padding).to_bytes((cell_count * bits + padding) // 8, 'big')
+
+#anything bytes like works, a memoryview straight out of the mapped file included.
+def unpack_values(view, size):
+    cell_count = size * size
+    bits = get_bits(size)
+    if bits == 4:
+        #every byte is two cells, and hex() writes every byte as its two nibbles in that order.
+        return list(view.hex().encode().translate(NIBBLES)[:cell_count])
+    packed = int.from_bytes(view, 'big') >> (-(cell_count * bits) % 8)
+    mask = (1 << bits) - 1
+    return [(packed >> (bits * (cell_count - 1 - k))) & mask for k in range(cell_count)]
+
+def unpack_grid(view, size):
+    values = unpack_values(view, size)
+    return [values[r * size:(r + 1) * size] for r in range(size)]
+
+def is_packed(path):
+    if path == '-':
+        return False
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+#writes a packed file record by record, the count in the header is filled in by close().
+class PackedWriter():
+    def __init__(self, path, size, solutions = False, stats = False):
+        self.size = size
+        self.bits = get_bits(size)
+        self.flags = (FLAG_SOLUTIONS if solutions else 0) | (FLAG_STATS if stats else 0)
+        self.empty = bytes(get_cell_bytes(size))
+        self.count = 0
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, size, self.bits, self.flags, 0))
+
+    #solution None means there isn't one.  solution and guesses are only written if the file has room.
+    def write(self, grid, solution = None, guesses = 0):
+        if len(grid) != self.size:
+            raise ValueError('a %sx%s puzzle in a file of %sx%s ones' % (len(grid), len(grid), self.size, self.size))
+        self.file.write(pack_grid(grid, self.bits))
+        if self.flags & FLAG_SOLUTIONS:
+            self.file.write(pack_grid(solution, self.bits) if solution is not None else self.empty)
+        if self.flags & FLAG_STATS:
+            self.file.write(STATS.pack(guesses))
+        self.count += 1
+
+    def close(self):
+        self.file.seek(COUNT_OFFSET)
+        self.file.write(struct.pack('<Q', self.count))
+        self.file.close()
+
+class PackedReader():
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        magic, version, self.size, self.bits, self.flags, self.count = HEADER.unpack_from(self.view)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError('%s is not a version %s packed puzzle file' % (path, VERSION))
+        self.cell_bytes = get_cell_bytes(self.size)
+        self.record_size = self.cell_bytes * (2 if self.flags & FLAG_SOLUTIONS else 1) + (STATS.size if self.flags & FLAG_STATS else 0)
+        if len(self.view) < HEADER.size + self.count * self.record_size:
+            self.close()
+            raise ValueError('%s is cut short, the header says %s records' % (path, self.count))
+
+    def __len__(self):
+        return self.count
+
+    def record(self, index):
+        start = HEADER.size + index * self.record_size
+        return self.view[start:start + self.record_size]
+
+    #the puzzle of every record, as memoryviews into the file.  unpack_grid() them with self.size.
+    def __iter__(self):
+        cell_bytes = self.cell_bytes
+        for index in range(self.count):
+            yield self.record(index)[:cell_bytes]
+
+    #(puzzle grid, solution grid or None, guesses or None) for every record.
+    def records(self):
+        cell_bytes = self.cell_bytes
+        for index in range(self.count):
+            record = self.record(index)
+            solution = guesses = None
+            if self.flags & FLAG_SOLUTIONS:
+                solution_view = record[cell_bytes:2 * cell_bytes]
+                if any(solution_view):
+                    solution = unpack_grid(solution_view, self.size)
+            if self.flags & FLAG_STATS:
+                guesses = STATS.unpack_from(record, self.record_size - STATS.size)[0]
+            yield unpack_grid(record[:cell_bytes], self.size), solution, guesses
+
+    def close(self):
+        self.view.release()
+        try:
+            self.map.close()
+        except BufferError:
+            pass #somebody still holds a slice, the map goes when the last of them does.
+        self.file.close()
+
+#text to packed, solving every puzzle on the way if solve is set.  returns the number of puzzles.
+def pack(input_file, path, solve=False, engine_name=engines.DEFAULT_ENGINE, propagation=engine.DEFAULT_PROPAGATION):
+    writer = None
+    try:
+        for line_number, line in puzzles.read_lines(input_file):
+            try:
+                grid = puzzles.parse_line(line)
+                if writer is None:
+                    writer = PackedWriter(path, len(grid), solve, solve)
+                stats = {'guesses': 0}
+                solution = engines.solve(grid, stats, engine_name, propagation) if solve else None
+                writer.write(grid, solution, stats['guesses'])
+            except ValueError as e:
+                raise ValueError('line %s: %s' % (line_number, e))
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        raise ValueError('no puzzles to pack')
+    return writer.count
+
+#packed to text, the puzzles or, with solutions, what the file has for their solutions.
+def unpack(path, output_file, solutions=False):
+    reader = PackedReader(path)
+    try:
+        if solutions and not reader.flags & FLAG_SOLUTIONS:
+            raise ValueError('%s has no solutions in it' % path)
+        for grid, solution, guesses in reader.records():
+            if solutions:
+                output_file.write((puzzles.format_grid(solution) if solution is not None else NO_SOLUTION) + '\n')
+            else:
+                output_file.write(puzzles.format_grid(grid) + '\n')
+        return reader.count
+    finally:
+        reader.close()
+
+def setup_args(argv=None):
+    arg_parser = argparse.ArgumentParser(prog='packed', description='Convert puzzle files between the text and the packed binary format.')
+    arg_parser.add_argument('direction', help='pack: text to binary, unpack: binary to text.', choices=['pack', 'unpack'])
+    arg_parser.add_argument('input', help="file to convert, '-' reads text from stdin.")
+    arg_parser.add_argument('output', help="file to write, '-' writes text to stdout.")
+    arg_parser.add_argument('--solve', help='pack: solve every puzzle and store the solution and guess count with it.', action='store_true')
+    arg_parser.add_argument('--solutions', help='unpack: write the stored solutions instead of the puzzles.', action='store_true')
+    arg_parser.add_argument('--engine', help='solver backend for --solve, default: ' + engines.DEFAULT_ENGINE + '.', choices=list(engines.ENGINES), default=engines.DEFAULT_ENGINE)
+    arg_parser.add_argument('--propagation', help='constraint propagation for --solve, default: ' + engine.DEFAULT_PROPAGATION + '.', choices=list(engine.PROPAGATION_LEVELS), default=engine.DEFAULT_PROPAGATION)
+    args = arg_parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    return args
+
+def main(argv=None):
+    args = setup_args(argv)
+    logger = logging.getLogger(__name__)
+    try:
+        if args.direction == 'pack':
+            input_file = puzzles.open_input(args.input)
+            try:
+                count = pack(input_file, args.output, args.solve, args.engine, args.propagation)
+            finally:
+                if input_file is not sys.stdin:
+                    input_file.close()
+        else:
+            output_file = puzzles.open_output(args.output)
+            try:
+                count = unpack(args.input, output_file, args.solutions)
+            finally:
+                if output_file is not sys.stdout:
+                    output_file.close()
+                else:
+                    output_file.flush()
+    except ValueError as e:
+        logger.error(e)
+        return 1
+    logger.info("%s puzzles %sed" % (count, args.direction))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+
+#one hard puzzle on several cores: python3 -m sudoku.parallel [puzzles.txt] [--workers N] [--depth N]
+#the search tree of the backtracking engine is expanded down to a fixed depth in this process, every
+#node at that depth is a subtree that a worker process searches on its own.  workers run their search
+#in chunks and check a shared event in between, so once the answer is in the rest stop straight away
+#and the pool can be used for the next puzzle.
+#without an input file it runs the hard and adversarial corpus, --compare adds the single core engine
+#so the speedup can be read off the log.
+
+import sys, logging, argparse, os, time, threading
+from functools import partial
+
+import sudoku.utils as utils
+import sudoku.puzzles as puzzles
+import sudoku.corpus as corpus
+import sudoku.engine as engine
+from sudoku.utils import positive_int, non_negative_int
+from sudoku.puzzles import NO_SOLUTION, MULTIPLE_SOLUTIONS
+
+DEFAULT_FRONTIER_DEPTH = 4
+DEFAULT_CLASSES = ['hard', 'adversarial']
+#guesses a worker makes between looks at the cancel event.
+CHUNK_GUESSES = 256
+
+#set by init_worker in every worker process, the same event the parent sets to cancel.
+cancel_event = None
+
+def init_worker(event):
+    global cancel_event
+    cancel_event = event
+
+#expand the search tree of a propagated board down to depth guesses, the same way search() would walk
+#it, and append the grid at every node there to subtrees.  a branch that is solved or dead before it
+#gets that deep ends where it is (dead ones are dropped).
+def expand(board, depth, subtrees):
+    cell = board.choose_cell()
+    if depth == 0 or cell < 0:
+        subtrees.append(board.to_grid())
+        return
+    for value in utils.mask_digits(board.choices[cell]):
+        board.guesses += 1
+        mark = len(board.trail)
+        if board.mark_chosen(cell, value):
+            expand(board, depth - 1, subtrees)
+        board.mark_unchosen(mark)
+
+"""
+split a puzzle into subtrees (grids) whose solutions together are exactly the puzzle's.
+returns (subtrees, guesses spent on the split).  no subtrees means no solution.
+"""
+def split(grid, frontier_depth, propagation=engine.DEFAULT_PROPAGATION):
+    board = engine.Board(grid, propagation)
+    subtrees = []
+    if board.consistent and board.propagate():
+        expand(board, frontier_depth, subtrees)
+    return subtrees, board.guesses
+
+#runs in the workers.  searches one subtree for up to limit solutions (None for all of them).
+#returns the solutions as flat value lists and the guesses it took.
+def search_subtree(propagation, limit, grid):
+    board = engine.Board(grid, propagation)
+    solutions = []
+    while not cancel_event.is_set():
+        found = board.search(CHUNK_GUESSES)
+        if found is None:
+            continue
+        if not found:
+            break
+        solutions.append(board.partial_values())
+        if limit is not None and len(solutions) >= limit:
+            break
+        board.skip_solution()
+    return solutions, board.guesses
+
+class ParallelSearch():
+    def __init__(self, workers, frontier_depth = DEFAULT_FRONTIER_DEPTH, propagation = engine.DEFAULT_PROPAGATION):
+        self.workers = workers
+        self.frontier_depth = frontier_depth
+        self.propagation = propagation
+        if workers == 1:
+            #same as batch, no pool for a single worker.  the subtrees run in here, one after the other.
+            self.cancel = threading.Event()
+            init_worker(self.cancel)
+            self.pool = None
+        else:
+            import multiprocessing
+            self.cancel = multiprocessing.Event()
+            self.pool = multiprocessing.Pool(workers, init_worker, (self.cancel,))
+
+    """
+    up to limit solutions of the grid (every one of them if limit is None), as grids, in whatever
+    order the workers find them.  stats gets the guess count, over the split and every subtree that
+    finished, and the number of subtrees.
+    """
+    def solutions(self, grid, limit = None, stats = None):
+        size = len(grid)
+        subtrees, guesses = split(grid, self.frontier_depth, self.propagation)
+        search_fn = partial(search_subtree, self.propagation, limit)
+        if self.pool is None:
+            results = map(search_fn, subtrees)
+        else:
+            #one subtree per task, they differ far too much in size to hand them out in chunks.
+            results = self.pool.imap_unordered(search_fn, subtrees)
+
+        solutions = []
+        try:
+            for found, subtree_guesses in results:
+                guesses += subtree_guesses
+                if limit is None or len(solutions) < limit:
+                    solutions.extend(found[:None if limit is None else limit - len(solutions)])
+                    if limit is not None and len(solutions) >= limit:
+                        #the rest see this at their next chunk and return what they have.  still read
+                        #them all, so nothing from this puzzle is left in the pool for the next one.
+                        self.cancel.set()
+        finally:
+            self.cancel.clear()
+
+        if stats is not None:
+            stats['guesses'] = guesses
+            stats['subtrees'] = len(subtrees)
+        return [[values[r * size:(r + 1) * size] for r in range(size)] for values in solutions]
+
+    #the first solution any worker finds, None if there isn't one.
+    def solve(self, grid, stats = None):
+        solutions = self.solutions(grid, 1, stats)
+        return solutions[0] if solutions else None
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+"""
+engine.solve, but on worker processes.  for more than one puzzle keep a ParallelSearch around instead,
+starting the pool costs more than an easy solve.
+"""
+def solve(grid, stats=None, propagation=engine.DEFAULT_PROPAGATION, workers=None, frontier_depth=DEFAULT_FRONTIER_DEPTH):
+    search = ParallelSearch(workers or os.cpu_count() or 1, frontier_depth, propagation)
+    try:
+        return search.solve(grid, stats)
+    finally:
+        search.close()
+
+def setup_args(argv=None):
+    arg_parser = argparse.ArgumentParser(prog='solve-parallel', description='Solve hard sudokus one at a time, each one split over several processes.')
+    arg_parser.add_argument('input', help="puzzle file, one puzzle per line, '-' reads stdin.  default: the " + ' and '.join(DEFAULT_CLASSES) + " puzzles of the benchmark corpus.", nargs='?', default=None)
+    arg_parser.add_argument('--output', '-o', help='where the solutions go, one per line in input order, default: stdout.', default='-')
+    arg_parser.add_argument('--workers', help='number of worker processes, default: one per cpu.', type=positive_int, default=os.cpu_count() or 1)
+    arg_parser.add_argument('--depth', help='guesses deep to split the search tree, default: ' + str(DEFAULT_FRONTIER_DEPTH) + '.', type=non_negative_int, default=DEFAULT_FRONTIER_DEPTH)
+    arg_parser.add_argument('--propagation', help='constraint propagation, default: ' + engine.DEFAULT_PROPAGATION + '.', choices=list(engine.PROPAGATION_LEVELS), default=engine.DEFAULT_PROPAGATION)
+    arg_parser.add_argument('--check-unique', help="look for a second solution as well, puzzles with more than one are written out as '" + MULTIPLE_SOLUTIONS + "'.", action='store_true')
+    arg_parser.add_argument('--compare', help='also time the single core engine on every puzzle and log the speedup.', action='store_true')
+    arg_parser.add_argument('--debug', help='turn on debugging information', action='store_true')
+    args = arg_parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO, stream=sys.stderr)
+    return args
+
+def main(argv=None):
+    args = setup_args(argv)
+    logger = logging.getLogger(__name__)
+
+    limit = 2 if args.check_unique else 1
+    parallel_total = single_total = 0.0
+    input_file = output_file = search = None
+    try:
+        if args.input is None:
+            lines = [(name, line) for puzzle_class in DEFAULT_CLASSES for name, line in corpus.CORPUS[puzzle_class]]
+        else:
+            input_file = puzzles.open_input(args.input)
+            lines = puzzles.read_lines(input_file)
+        output_file = puzzles.open_output(args.output)
+        search = ParallelSearch(args.workers, args.depth, args.propagation)
+        for name, line in lines:
+            try:
+                grid = puzzles.parse_line(line)
+            except ValueError as e:
+                logger.error('line %s: %s' % (name, e))
+                return 1
+            stats = {}
+            start_time = time.perf_counter()
+            solutions = search.solutions(grid, limit, stats)
+            elapsed = time.perf_counter() - start_time
+            parallel_total += elapsed
+
+            if len(solutions) > 1:
+                output_file.write(MULTIPLE_SOLUTIONS + '\n')
+            else:
+                output_file.write((puzzles.format_grid(solutions[0]) if solutions else NO_SOLUTION) + '\n')
+
+            message = "%-20s %.4fs  subtrees %4s  guesses %6s" % (name, elapsed, stats['subtrees'], stats['guesses'])
+            if args.compare:
+                single_stats = {}
+                start_time = time.perf_counter()
+                if args.check_unique:
+                    engine.count_solutions(grid, limit, single_stats, args.propagation)
+                else:
+                    engine.solve(grid, single_stats, args.propagation)
+                single_elapsed = time.perf_counter() - start_time
+                single_total += single_elapsed
+                message += "  single core %.4fs  guesses %6s  speedup %.2fx" % (single_elapsed, single_stats['guesses'], single_elapsed / elapsed if elapsed > 0 else 0.0)
+            logger.info(message)
+    except OSError as e:
+        logger.error(e)
+        return 1
+    finally:
+        if search is not None:
+            search.close()
+        if input_file is not None and input_file is not sys.stdin:
+            input_file.close()
+        if output_file is sys.stdout:
+            output_file.flush()
+        elif output_file is not None:
+            output_file.close()
+
+    if args.compare and parallel_total > 0:
+        logger.info("total %.4fs on %s workers, single core %.4fs, speedup %.2fx" % (parallel_total, args.workers, single_total, single_total / parallel_total))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
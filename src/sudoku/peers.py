@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+#everything in here depends only on the board size, so it gets built once per size and cached.
+#cells are numbered row major: cell = row * size + column.
+
+from functools import lru_cache
+
+import sudoku.utils as utils
+
+@lru_cache(maxsize=None)
+def get_cell_units(size):
+    #for every cell, the index of the row, column and block it sits in.
+    block_size = utils.isqrt(size)
+    cells = range(size * size)
+    rows = tuple(i // size for i in cells)
+    columns = tuple(i % size for i in cells)
+    blocks = tuple((r // block_size) * block_size + (c // block_size) for r, c in zip(rows, columns))
+    return rows, columns, blocks
+
+@lru_cache(maxsize=None)
+def get_units(size):
+    #the cells of every row, column and block, in that order.  3 * size units in total.
+    rows, columns, blocks = get_cell_units(size)
+    cells = range(size * size)
+    row_units = tuple(tuple(i for i in cells if rows[i] == u) for u in range(size))
+    column_units = tuple(tuple(i for i in cells if columns[i] == u) for u in range(size))
+    block_units = tuple(tuple(i for i in cells if blocks[i] == u) for u in range(size))
+    return row_units + column_units + block_units
+
+@lru_cache(maxsize=None)
+def get_unit_peers(size):
+    #for every cell, its (row peers, column peers, block peers), the cell itself left out.
+    rows, columns, blocks = get_cell_units(size)
+    units = get_units(size)
+    return tuple((tuple(p for p in units[rows[i]] if p != i),
+                  tuple(p for p in units[size + columns[i]] if p != i),
+                  tuple(p for p in units[2 * size + blocks[i]] if p != i)) for i in range(size * size))
+
+@lru_cache(maxsize=None)
+def get_peers(size):
+    #for every cell, every other cell sharing a row, column or block with it.  20 of them on a 9x9.
+    return tuple(tuple(sorted(set(row + column + block))) for row, column, block in get_unit_peers(size))
+
+@lru_cache(maxsize=None)
+def get_intersections(size):
+    #every place a block crosses a row or column, as (segment, rest of the line, rest of the block).
+    #these are what locked candidates (pointing/claiming) work on.
+    units = get_units(size)
+    lines = units[:2 * size]
+    blocks = units[2 * size:]
+    intersections = []
+    for block in blocks:
+        block_cells = set(block)
+        for line in lines:
+            segment = tuple(i for i in line if i in block_cells)
+            if len(segment) == 0:
+                continue
+            line_rest = tuple(i for i in line if i not in block_cells)
+            block_rest = tuple(i for i in block if i not in segment)
+            intersections.append((segment, line_rest, block_rest))
+    return tuple(intersections)
+
+#boilerplate
+def main():
+    raise Exception("do not directly call this module.")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+#reading and writing puzzles as text, one puzzle per line.
+#the usual format is one character per cell, row major: 81 characters for a 9x9, 256 for a 16x16,
+#625 for a 25x25.  '.' or '0' is a blank, digits above 9 are letters (A is 10, B is 11, ...).
+#boards too big for that (36x36) can be written as whitespace or comma separated numbers instead.
+#blank lines and lines starting with '#' are skipped.
+
+import sys, re
+
+import sudoku.utils as utils
+
+DIGITS = '123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+BLANKS = '.0'
+SEPARATORS = re.compile(r'[\s,]+')
+#what goes out in place of a solution.
+NO_SOLUTION = 'no solution'
+MULTIPLE_SOLUTIONS = 'multiple solutions'
+
+def get_size(cell_count):
+    #cell_count has to be size * size with size itself a perfect square.
+    size = utils.isqrt(cell_count, raiseOnError=False)
+    if size == -1 or utils.isqrt(size, raiseOnError=False) == -1:
+        raise ValueError('%s cells is not a sudoku' % cell_count)
+    return size
+
+def parse_value(token, size):
+    if token in BLANKS:
+        return 0
+    if token.isdigit() and len(token) > 1:
+        value = int(token)
+    else:
+        value = DIGITS.find(token.upper()) + 1
+    if not 1 <= value <= size:
+        raise ValueError('%r is not a value on a %sx%s board' % (token, size, size))
+    return value
+
+def parse_line(line):
+    line = line.strip()
+    if SEPARATORS.search(line):
+        tokens = [t for t in SEPARATORS.split(line) if t]
+    else:
+        tokens = line
+    size = get_size(len(tokens))
+    values = [parse_value(token, size) for token in tokens]
+    return [values[r * size:(r + 1) * size] for r in range(size)]
+
+def format_grid(grid):
+    size = len(grid)
+    if size <= len(DIGITS):
+        return ''.join(DIGITS[v - 1] if v else '.' for row in grid for v in row)
+    return ' '.join(str(v) for row in grid for v in row)
+
+def is_puzzle_line(line):
+    line = line.strip()
+    return len(line) > 0 and not line.startswith('#')
+
+#yields (line number, line) for every puzzle line, without parsing it, so that the parsing can be
+#done wherever the solving is.
+def read_lines(stream):
+    for line_number, line in enumerate(stream, 1):
+        if is_puzzle_line(line):
+            yield line_number, line.strip()
+
+def read_puzzles(stream):
+    for line_number, line in read_lines(stream):
+        try:
+            yield parse_line(line)
+        except ValueError as e:
+            raise ValueError('line %s: %s' % (line_number, e))
+
+#'-' is stdin/stdout, same as most command line tools.
+def open_input(path):
+    if path == '-':
+        return sys.stdin
+    return open(path, 'r')
+
+def open_output(path):
+    if path == '-':
+        return sys.stdout
+    return open(path, 'w')
+
+#boilerplate
+def main():
+    raise Exception("do not directly call this module.")
+if __name__ == '__main__':
+    main()
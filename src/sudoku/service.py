@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+
+#the solver as a local http/json service: python3 -m sudoku.service [--port 8080] [--workers N]
+#standard library only.  an asyncio server takes the requests, the solving happens on a process pool.
+#    POST /solve    {"puzzle": "<puzzle line>", "timeout": seconds, "check_unique": false}
+#                   -> {"status": "solved", "solution": "<line>", "guesses": n, "elapsed": s, "coalesced": false}
+#                   status is one of solved, no solution, multiple solutions.  400 for a bad puzzle,
+#                   504 when it takes longer than the timeout.
+#    POST /bulk     one request per line (the json above, or just the puzzle line), the answers stream
+#                   back as ndjson in the same order, each with its line number.
+#    GET /metrics   queue depth, solves in flight, latency histogram and percentiles, solves/s.
+#identical puzzles asked for while one of them is still being solved share that one solve.  the pool
+#only ever gets as many solves as it has workers, the rest wait in here, which is what the queue
+#depth counts.  sudoku.loadtest drives this from the other end.
+
+import sys, logging, argparse, os, time, json, asyncio, bisect, collections
+import concurrent.futures
+from functools import partial
+
+import sudoku.puzzles as puzzles
+import sudoku.engine as engine
+import sudoku.engines as engines
+from sudoku.puzzles import NO_SOLUTION, MULTIPLE_SOLUTIONS
+from sudoku.utils import positive_int
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+DEFAULT_TIMEOUT = 10.0
+#a solve that is still going after this long is given up on in the worker, whoever is waiting for it,
+#so one runaway puzzle can't keep a worker forever.
+DEFAULT_MAX_SOLVE_TIME = 60.0
+#guesses a worker makes between looks at the clock.
+CHUNK_GUESSES = 256
+#biggest /solve body, /bulk bodies are read a line at a time and can be any length.
+MAX_BODY = 1 << 20
+#/bulk lines solved ahead of the one being written out.
+BULK_WINDOW = 64
+#upper bounds of the latency histogram buckets, in ms.
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+#latencies kept for the percentiles, and the seconds solves/s is taken over.
+RECENT_LATENCIES = 10000
+RATE_WINDOW = 10.0
+SOLVED = 'solved'
+TIMED_OUT = 'timed out'
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 411: 'Length Required',
+               413: 'Payload Too Large', 500: 'Internal Server Error', 504: 'Gateway Timeout'}
+
+#a request the client got wrong, answered with status and the message.
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+#runs in the workers.  returns (status, solution line or None, guesses).  the search goes a chunk at a
+#time so it can stop at max_solve_time.
+def solve_puzzle(engine_name, propagation, max_solve_time, check_unique, grid):
+    board = engines.ENGINES[engine_name](grid, propagation)
+    deadline = time.perf_counter() + max_solve_time
+    solutions = []
+    while True:
+        found = board.search(CHUNK_GUESSES)
+        if found is None:
+            if time.perf_counter() > deadline:
+                return TIMED_OUT, None, board.guesses
+            continue
+        if not found:
+            break
+        solutions.append(puzzles.format_grid(board.to_grid()))
+        if not check_unique or len(solutions) > 1:
+            break
+        board.skip_solution()
+    if len(solutions) > 1:
+        return MULTIPLE_SOLUTIONS, None, board.guesses
+    if solutions:
+        return SOLVED, solutions[0], board.guesses
+    return NO_SOLUTION, None, board.guesses
+
+#a puzzle as a grid, from a puzzle line or a list of rows.
+def parse_puzzle(puzzle):
+    try:
+        if isinstance(puzzle, str):
+            return puzzles.parse_line(puzzle)
+        if isinstance(puzzle, list) and all(isinstance(row, list) for row in puzzle):
+            puzzles.get_size(sum(len(row) for row in puzzle))
+            #bool is an int as far as isinstance goes, same as for the timeout.
+            if all(len(row) == len(puzzle) and all(isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= len(puzzle) for value in row) for row in puzzle):
+                return puzzle
+    except ValueError as e:
+        raise RequestError(400, str(e))
+    raise RequestError(400, 'puzzle has to be a puzzle line or a list of rows')
+
+class Metrics():
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.requests = 0
+        self.solves = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latency_sum = 0.0
+        self.recent = collections.deque(maxlen=RECENT_LATENCIES)
+        self.finished = collections.deque()
+
+    #latency in seconds of a request that got an answer, timed out ones included.
+    def record(self, latency):
+        ms = latency * 1000
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.latency_sum += ms
+        self.recent.append(ms)
+
+    def record_solve(self):
+        self.solves += 1
+        now = time.perf_counter()
+        self.finished.append(now)
+        while self.finished and self.finished[0] < now - RATE_WINDOW:
+            self.finished.popleft()
+
+    def snapshot(self, queue_depth, in_flight):
+        now = time.perf_counter()
+        uptime = now - self.start_time
+        window = min(RATE_WINDOW, uptime)
+        recent_solves = sum(1 for t in self.finished if t >= now - RATE_WINDOW)
+        recent = sorted(self.recent)
+        percentile = lambda p: round(recent[min(len(recent) - 1, int(p * len(recent)))], 3) if recent else None
+        cumulative = 0
+        histogram = {}
+        for bound, count in zip(LATENCY_BUCKETS_MS + ['+Inf'], self.buckets):
+            cumulative += count
+            histogram[str(bound)] = cumulative
+        return {'uptime': round(uptime, 3),
+                'queue_depth': queue_depth,
+                'in_flight': in_flight,
+                'requests': self.requests,
+                'solves': self.solves,
+                'coalesced': self.coalesced,
+                'timeouts': self.timeouts,
+                'errors': self.errors,
+                'solves_per_second': round(recent_solves / window, 3) if window > 0 else 0.0,
+                'solves_per_second_total': round(self.solves / uptime, 3) if uptime > 0 else 0.0,
+                'latency_ms': {'buckets': histogram,
+                               'count': cumulative,
+                               'sum': round(self.latency_sum, 3),
+                               'p50': percentile(0.5),
+                               'p90': percentile(0.9),
+                               'p99': percentile(0.99),
+                               'max': round(recent[-1], 3) if recent else None}}
+
+class SolveService():
+    def __init__(self, workers, engine_name = engines.DEFAULT_ENGINE, propagation = engine.DEFAULT_PROPAGATION,
+                 timeout = DEFAULT_TIMEOUT, max_solve_time = DEFAULT_MAX_SOLVE_TIME):
+        self.workers = workers
+        self.engine_name = engine_name
+        self.propagation = propagation
+        self.timeout = timeout
+        self.max_solve_time = max_solve_time
+        self.pool = concurrent.futures.ProcessPoolExecutor(workers)
+        #one slot per worker, solves waiting for one are the queue.
+        self.slots = asyncio.Semaphore(workers)
+        self.queued = 0
+        self.running = 0
+        #(check_unique, puzzle) -> the task solving it, while it's being solved.
+        self.in_progress = {}
+        self.metrics = Metrics()
+        self.logger = logging.getLogger(__name__)
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    async def compute(self, key, grid):
+        self.queued += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.queued -= 1
+        self.running += 1
+        try:
+            solve_fn = partial(solve_puzzle, self.engine_name, self.propagation, self.max_solve_time, key[0], grid)
+            return await asyncio.get_running_loop().run_in_executor(self.pool, solve_fn)
+        finally:
+            self.running -= 1
+            self.slots.release()
+            del self.in_progress[key]
+            self.metrics.record_solve()
+
+    """
+    one solve request as a dict, returns (http status, answer dict).  the solve itself is shared with
+    every other request for the same puzzle that comes in before it's done.
+    """
+    async def solve(self, request):
+        start_time = time.perf_counter()
+        self.metrics.requests += 1
+        try:
+            if not isinstance(request, dict) or 'puzzle' not in request:
+                raise RequestError(400, 'expected an object with a puzzle')
+            grid = parse_puzzle(request['puzzle'])
+            timeout = request.get('timeout', self.timeout)
+            #bool is an int as far as isinstance goes, true is not a timeout.
+            if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+                raise RequestError(400, 'timeout has to be a positive number of seconds')
+            check_unique = request.get('check_unique', False)
+            if not isinstance(check_unique, bool):
+                raise RequestError(400, 'check_unique has to be true or false')
+        except RequestError as e:
+            self.metrics.errors += 1
+            return e.status, {'error': str(e)}
+
+        key = (check_unique, tuple(value for row in grid for value in row))
+        task = self.in_progress.get(key)
+        coalesced = task is not None
+        if coalesced:
+            self.metrics.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self.compute(key, grid))
+            self.in_progress[key] = task
+        try:
+            #shielded, a request that gives up doesn't take the solve away from the others waiting on it.
+            status, solution, guesses = await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            status, solution, guesses = TIMED_OUT, None, None
+        except Exception as e:
+            self.logger.exception('solve failed')
+            self.metrics.errors += 1
+            return 500, {'error': str(e)}
+        elapsed = time.perf_counter() - start_time
+        self.metrics.record(elapsed)
+        answer = {'status': status, 'solution': solution, 'guesses': guesses, 'elapsed': round(elapsed, 6), 'coalesced': coalesced}
+        if status == TIMED_OUT:
+            self.metrics.timeouts += 1
+            return 504, answer
+        return 200, answer
+
+    #a /bulk line: the json request, or just the puzzle line.
+    async def solve_line(self, line_number, line):
+        try:
+            request = json.loads(line) if line.startswith('{') else {'puzzle': line}
+        except ValueError as e:
+            self.metrics.errors += 1
+            status, answer = 400, {'error': 'bad json: %s' % e}
+        else:
+            status, answer = await self.solve(request)
+        answer['line'] = line_number
+        return answer
+
+    def get_metrics(self):
+        return self.metrics.snapshot(self.queued, self.running)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while await self.handle_request(reader, writer):
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    #one request off the connection, False when the connection is done with.
+    async def handle_request(self, reader, writer):
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return False
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        try:
+            try:
+                method, target, version = request_line.decode('latin-1').split()
+            except ValueError:
+                raise RequestError(400, 'bad request line')
+            keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+            path = target.split('?', 1)[0]
+
+            if path == '/metrics':
+                if method != 'GET':
+                    raise RequestError(405, 'use GET')
+                await write_response(writer, 200, self.get_metrics(), keep_alive)
+                return keep_alive
+            if path not in ('/solve', '/bulk'):
+                raise RequestError(404, 'no such endpoint: ' + path)
+            if method != 'POST':
+                raise RequestError(405, 'use POST')
+            if 'content-length' not in headers:
+                raise RequestError(411, 'a Content-Length is needed')
+            try:
+                length = int(headers['content-length'])
+            except ValueError:
+                raise RequestError(400, 'bad Content-Length')
+            if path == '/bulk':
+                await self.bulk(reader, writer, length, keep_alive)
+                return keep_alive
+            if length > MAX_BODY:
+                raise RequestError(413, 'more than %s bytes, use /bulk' % MAX_BODY)
+            body = await reader.readexactly(length)
+            try:
+                request = json.loads(body)
+            except ValueError as e:
+                raise RequestError(400, 'bad json: %s' % e)
+            status, answer = await self.solve(request)
+            await write_response(writer, status, answer, keep_alive)
+            return keep_alive
+        except RequestError as e:
+            #every client error that doesn't get as far as solve(), which counts its own.
+            self.metrics.errors += 1
+            #the body, if there was one, is still on the connection, so it can't be reused.
+            await write_response(writer, e.status, {'error': str(e)}, False)
+            return False
+
+    #the answers go out as the lines come in, in order, up to BULK_WINDOW lines solving ahead of the
+    #one being written.  reading stops while the window is full, so a huge body doesn't pile up in here.
+    async def bulk(self, reader, writer, length, keep_alive):
+        pending = asyncio.Queue(BULK_WINDOW)
+
+        async def read_lines():
+            remaining = length
+            buffered = b''
+            line_number = 0
+            while remaining > 0:
+                data = await reader.read(min(remaining, 1 << 16))
+                if not data:
+                    break
+                remaining -= len(data)
+                *lines, buffered = (buffered + data).split(b'\n')
+                for line in lines + ([buffered] if remaining <= 0 else []):
+                    line_number += 1
+                    line = line.decode('utf-8', 'replace').strip()
+                    if puzzles.is_puzzle_line(line):
+                        await pending.put(asyncio.ensure_future(self.solve_line(line_number, line)))
+            await pending.put(None)
+
+        writer.write(('HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n'
+                      'Connection: %s\r\n\r\n' % ('keep-alive' if keep_alive else 'close')).encode('latin-1'))
+        reading = asyncio.ensure_future(read_lines())
+        try:
+            while True:
+                task = await pending.get()
+                if task is None:
+                    break
+                chunk = (json.dumps(await task) + '\n').encode()
+                writer.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+                await writer.drain()
+            writer.write(b'0\r\n\r\n')
+            await writer.drain()
+        finally:
+            reading.cancel()
+            while not pending.empty():
+                task = pending.get_nowait()
+                if task is not None:
+                    task.cancel()
+
+async def write_response(writer, status, answer, keep_alive):
+    body = (json.dumps(answer) + '\n').encode()
+    writer.write(('HTTP/1.1 %s %s\r\nContent-Type: application/json\r\nContent-Length: %s\r\nConnection: %s\r\n\r\n'
+                  % (status, STATUS_TEXT[status], len(body), 'keep-alive' if keep_alive else 'close')).encode('latin-1') + body)
+    await writer.drain()
+
+async def serve(args):
+    logger = logging.getLogger(__name__)
+    service = SolveService(args.workers, args.engine, args.propagation, args.timeout, args.max_solve_time)
+    try:
+        server = await asyncio.start_server(service.handle_connection, args.host, args.port)
+        logger.info("serving on http://%s:%s with %s workers" % (args.host, args.port, args.workers))
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+def setup_args(argv=None):
+    arg_parser = argparse.ArgumentParser(prog='solve-service', description='Serve the solver over http/json.')
+    arg_parser.add_argument('--host', help='address to listen on, default: ' + DEFAULT_HOST + '.', default=DEFAULT_HOST)
+    arg_parser.add_argument('--port', help='port to listen on, default: ' + str(DEFAULT_PORT) + '.', type=int, default=DEFAULT_PORT)
+    arg_parser.add_argument('--workers', help='number of worker processes, default: one per cpu.', type=positive_int, default=os.cpu_count() or 1)
+    arg_parser.add_argument('--timeout', help='seconds a request waits for its answer unless it asks for something else, default: ' + str(DEFAULT_TIMEOUT) + '.', type=float, default=DEFAULT_TIMEOUT)
+    arg_parser.add_argument('--max-solve-time', help='seconds a worker spends on one puzzle before giving up on it, default: ' + str(DEFAULT_MAX_SOLVE_TIME) + '.', type=float, default=DEFAULT_MAX_SOLVE_TIME)
+    arg_parser.add_argument('--engine', help='solver backend, default: ' + engines.DEFAULT_ENGINE + '.', choices=list(engines.ENGINES), default=engines.DEFAULT_ENGINE)
+    arg_parser.add_argument('--propagation', help='constraint propagation for the backtracking engine, default: ' + engine.DEFAULT_PROPAGATION + '.', choices=list(engine.PROPAGATION_LEVELS), default=engine.DEFAULT_PROPAGATION)
+    arg_parser.add_argument('--debug', help='turn on debugging information', action='store_true')
+    args = arg_parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO, stream=sys.stderr)
+    return args
+
+def main(argv=None):
+    args = setup_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,156 +1,67 @@
 #!/usr/bin/env python3
 
-import cProfile, pstats, io
-import sys, logging, argparse, pprint, random, math, os, time
+import sys, logging, argparse, os, time
 from  tkinter import *
 import tkinter.messagebox as messagebox
 import tkinter.simpledialog as simpledialog
+import tkinter.filedialog as filedialog
 from functools import partial, reduce
-from operator import attrgetter
 
 #my own libraries
 import sudoku.utils as utils
 import sudoku.buttons as buttons
 import sudoku.structs as structs
+import sudoku.engine as engine
+import sudoku.engines as engines
+import sudoku.peers as peers
+import sudoku.instrumentation as instrumentation
+import sudoku.worker as worker
+import sudoku.puzzles as puzzles
+import sudoku.packed as packed
 from sudoku.constants import DEBUG
 from sudoku.constants import MAX_ROWS_COLUMNS
+from sudoku.constants import POLL_INTERVAL_MS
 import sudoku.globals as globals
+from sudoku.corpus import get_harder_initial_values
 
-#TODO: this can be done more effectively with Logging, but i'll deal with that in a bit
-def debug_print(printme, pretty=False):
+#lazy: nothing gets formatted unless debug logging is actually on.  printme can be a %-format string
+#with args, or a callable that builds the thing to print.
+def debug_print(printme, *args, pretty=False):
+    logger = logging.getLogger(__name__)
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if callable(printme):
+        printme = printme()
     if pretty:
+        import pprint
         printme = pprint.pformat(printme)
-    
-    logger = logging.getLogger(__name__)
-    logger.debug(printme)
+    logger.debug(printme, *args)
 
 def debug_print_button_array(button_array):
-    debug_print(list(button_array), True)
-
-#TODO: these need to come from user input or at least a .conf file
-def get_initial_values():
-    return [[5,3,0,0,7,0,0,0,0],
-            [6,0,0,1,9,5,0,0,0],
-            [0,9,8,0,0,0,0,6,0],
-            [8,0,0,0,6,0,0,0,3],
-            [4,0,0,8,0,3,0,0,1],
-            [7,0,0,0,2,0,0,0,6],
-            [0,6,0,0,0,0,2,8,0],
-            [0,0,0,4,1,9,0,0,5],
-            [0,0,0,0,8,0,0,7,9]]
-
-def get_medium_initial_values():
-    return [[0,3,0,6,0,5,0,0,0],
-            [6,0,0,0,9,0,0,0,2],
-            [0,7,0,1,0,0,0,0,6],
-            [0,9,0,0,0,0,0,0,0],
-            [8,1,0,0,5,0,0,6,9],
-            [0,0,0,0,0,0,0,8,0],
-            [4,0,0,0,0,3,0,2,0],
-            [9,0,0,0,2,0,0,0,5],
-            [0,0,0,9,0,8,0,3,0]]
-
-def get_harder_initial_values():
-    return [[0,0,0,0,0,0,0,0,0],
-            [0,0,0,0,0,3,0,8,5],
-            [0,0,1,0,2,0,0,0,0],
-            [0,0,0,5,0,7,0,0,0],
-            [0,0,4,0,0,0,1,0,0],
-            [0,9,0,0,0,0,0,0,0],
-            [5,0,0,0,0,0,0,7,3],
-            [0,0,2,0,1,0,0,0,0],
-            [0,0,0,0,4,0,0,0,9]] 
-
-def isqrt(n, raiseOnError = True):
-    #from https://stackoverflow.com/questions/15390807/integer-square-root-in-python/17495624
-    #i don't really care that it overflows on large values because the input size is sanitized
-    #much earlier.
-    assert(n >= 0)
-    i = int(math.sqrt(n) + 0.5)
-    if i**2 == n:
-        return i
-    if raiseOnError == True:
-        raise ValueError('input rows/columns were not a perfect square')
-    else:
-        return -1 #clearly not possible
-
-def isButtonInBlock(b, row, column, block_size):
-    #the modulus will be zero if i'm already on the starting row/column.
-    start_row = row - (row % block_size)
-    start_column = column - (column % block_size)
-
-    #end row/column are not inclusive, that's actually the start of the next block
-    end_row = start_row + block_size
-    end_column = start_column + block_size
-
-    return b.row >= start_row and \
-           b.row < end_row and \
-           b.column >= start_column and \
-           b.column < end_column
-
-block_size_calculated = 0
-#this function is the only one that actually requires a perfect square input.
-def get_block_size(button_array):
-    global block_size_calculated
-    if block_size_calculated != 0:
-        return block_size_calculated
-
-    max_row = max(button_array, key=attrgetter('row')).row
-    max_column = max(button_array, key=attrgetter('column')).column
-    
-    #these two statements ensure that the given inputs make nice blocks.
-    assert max_row == max_column
-    block_size = isqrt(max_row + 1)
+    debug_print(lambda: list(button_array), pretty=True)
 
-    block_size_calculated = block_size
-    return block_size
+def get_button_peers(button_array, pot_value):
+    #the precomputed (row, column, block) peer tuples for this location, so no check has to scan the whole board.
+    size = utils.isqrt(len(button_array))
+    return peers.get_unit_peers(size)[pot_value.row * size + pot_value.column]
+
+def find_conflict(button_array, candidates, pot_value):
+    return utils.find(lambda b: b.value == pot_value.value, (button_array[i] for i in candidates))
 
 def isValueInSameBlock(button_array, pot_value):
-    return utils.find(lambda b: b.value == pot_value.value and b.block == pot_value.block, button_array) \
-                        is not None
+    row_peers, column_peers, block_peers = get_button_peers(button_array, pot_value)
+    return find_conflict(button_array, block_peers, pot_value) is not None
     
 def isValueInRowOrColumn(button_array, pot_value):
-    row_check = lambda b: b.column != pot_value.column and b.row == pot_value.row and b.value == pot_value.value
-    column_check = lambda b: b.row != pot_value.row and b.column == pot_value.column and b.value == pot_value.value
-
-    return utils.find(lambda b: row_check(b) or column_check(b), button_array) is not None
+    row_peers, column_peers, block_peers = get_button_peers(button_array, pot_value)
+    return find_conflict(button_array, row_peers + column_peers, pot_value) is not None
 
 def isNewValueValid(button_array, pot_value):
     return not isValueInSameBlock(button_array, pot_value) and not isValueInRowOrColumn(button_array, pot_value) 
 
-def is_relevant(row, column, block, b): 
-    return b.value != 0 and (b.row == row or b.column == column or b.block == block)
-
 class ImpossibleChoices(Exception):
     pass
 
-def set_choices_for_button(button_array, empty_button):
-    #function defined to look at the choice set defined by 
-    #   1) row peers
-    #   2) column peers
-    #   3) block peers
-    empty_button.available_choices = set(range(1,10))
-    #remove any choice that's aleady present in the peer group, and you're left with the only valid choices for this button.
-    #entirely possible to be left with the empty set, which should be noticed by other code as an impossibility for a valid empty button.
-    for peer in filter(partial(is_relevant, empty_button.row, empty_button.column, empty_button.block), button_array):
-        empty_button.available_choices.discard(peer.value)
-        if len(empty_button.available_choices) == 0:
-            break
-
-    return empty_button
-
-def calculate_optimal_choice(button_array, all_empties):
-    #given a set of empty choices, find the one with the minimum number of available choices.
-    #this is somewhat of a heuristic, as it's typically how a human would solve it.
-
-    #map a function over all the empties which then sets the number of available choices it finds onto the button 
-    all_empties = list(map(partial(set_choices_for_button, button_array), all_empties))
-    #utils.map_in_place(partial(set_choices_for_button, button_array), all_empties)
-    
-    #next, min the entire empties list with available choices as the determinant.
-    #and return the result of that operation
-    return min(all_empties, key=lambda e: len(e.available_choices)), all_empties
-
 def clear_button_func(full_clear, button):
     if button.hard_set == False:
         button.set_value(0)
@@ -163,136 +74,100 @@ def clear_action(full_clear, button_array):
     reset_guesses_count_action()
     utils.map_in_place(partial(clear_button_func, full_clear), button_array)
 
-def solve_action(button_array):
+def get_grid(button_array):
+    #buttons are created row major, so the grid is just the values chopped up into rows.
+    size = utils.isqrt(len(button_array))
+    return [[b.value for b in button_array[r * size:(r + 1) * size]] for r in range(size)]
+
+def paint_values(button_array, values):
+    for button, value in zip(button_array, values):
+        if not button.hard_set:
+            button.set_value(value)
+
+def set_solving(solving):
+    #while a solve runs only cancel does anything, the rest would pull the board out from under it.
+    for button in globals.action_buttons:
+        button.configure(state=DISABLED if solving else NORMAL)
+    globals.cancel_button.configure(state=NORMAL if solving else DISABLED)
+    update_step_buttons(solving)
+
+def update_step_buttons(solving = False):
+    #stepping only does something with a puzzle that way.
+    index = globals.puzzle_index
+    for button, state in zip(globals.step_buttons, (index > 0, index < len(globals.puzzles) - 1)):
+        button.configure(state=NORMAL if state and not solving else DISABLED)
+
+def solve_action(engine_name, propagation, profile_path, button_array):
     debug_print("Solve action.")
-   
+    #the search runs on a worker thread against the headless board.  the buttons only get painted from
+    #what it sends back, picked up by poll_solve() on the tk main loop.
+    #profiling runs the instrumented board as well, so the counters come out next to the pstats file.
+    board_classes = engines.ENGINES if profile_path is None else instrumentation.INSTRUMENTED_ENGINES
+    board = board_classes[engine_name](get_grid(button_array), propagation)
+    start_values = [b.value for b in button_array]
+    start_guesses = globals.total_guesses.get()
+    globals.solve_worker = worker.SolveWorker(board, profile_path)
+    set_solving(True)
+    globals.solve_worker.start()
+    root.after(POLL_INTERVAL_MS, poll_solve, engine_name, propagation, button_array, start_values, start_guesses, time.perf_counter())
+
+def cancel_action():
+    debug_print("Cancel action.")
+    if globals.solve_worker is not None:
+        globals.solve_worker.cancel()
+
+def poll_solve(engine_name, propagation, button_array, start_values, start_guesses, start_time):
+    for message in globals.solve_worker.drain():
+        if message[0] == worker.PROGRESS:
+            kind, guesses, depth, values = message
+            debug_print("Progress: %s guesses, depth %s", guesses, depth)
+            globals.total_guesses.set(start_guesses + guesses)
+            paint_values(button_array, values)
+        else:
+            kind, solved, board = message
+            globals.solve_worker = None
+            set_solving(False)
+            finish_solve(engine_name, propagation, button_array, start_values, start_guesses, start_time, solved, board)
+            return
+    root.after(POLL_INTERVAL_MS, poll_solve, engine_name, propagation, button_array, start_values, start_guesses, start_time)
+
+def finish_solve(engine_name, propagation, button_array, start_values, start_guesses, start_time, solved, board):
     logger = logging.getLogger(__name__)
-  
-    #pr = cProfile.Profile()
-    #pr.enable()
-    
-    start_time = time.perf_counter()
-    #have to calculate this once.
-    block_size = get_block_size(button_array)
-    solved = guess(button_array)
     end_time = time.perf_counter()
+    globals.total_guesses.set(start_guesses + board.guesses)
+    if isinstance(board, tuple(instrumentation.INSTRUMENTED_ENGINES.values())):
+        logger.info("Counters: %s" % {counter: getattr(board, counter) for counter in instrumentation.COUNTERS})
     if solved == True:
-        logger.info("All done. Time to solve: %s" % float('%.3g' % (end_time - start_time)))
+        paint_values(button_array, board.values)
+        logger.info("All done. Time to solve: %s, guesses: %s, engine: %s, propagation: %s" % (float('%.3g' % (end_time - start_time)), board.guesses, engine_name, propagation))
+    elif solved is None:
+        #cancelled, put back what was there before the solve.
+        paint_values(button_array, start_values)
+        logger.info("Cancelled after %s, guesses: %s" % (float('%.3g' % (end_time - start_time)), board.guesses))
     else:
+        paint_values(button_array, start_values)
         logger.info("Cannot be solved. Time for attempt: %s" % float('%.3g' % (end_time - start_time)))
         isYes = messagebox.askyesno("Sudoku Solver", "No solution found.  Full clear the board?")
         if (isYes): 
             clear_action(True, button_array)
 
-    #pr.disable()
-    #s = io.StringIO()
-    #sortby = 'cumulative'
-    #ps = pstats.Stats(pr, stream=s).sort_stats(sortby)
-    #ps.print_stats()
-    #print(s.getvalue())
-
 def reset_guesses_count_action():
     globals.total_guesses.set(0)
-     
-def update_ui():
-    #debug_print('update_ui')
-    global root
-    root.update()
-
-def maybe_update_ui():
-    now_time = time.perf_counter()
-    if (now_time - globals.refresh_ui_time) > 0.1: 
-        globals.refresh_ui_time = now_time
-        update_ui()
-
-#these next two are the heart of the entire algorithm
-#in mark chosen, we remove from all of our empty peers our new choice, and remember them in case our choice doesn't work out.
-def mark_chosen(all_empties, pot_value):
-    for e in all_empties:
-        if pot_value.value in e.available_choices and \
-           (e.row == pot_value.row or \
-           e.column == pot_value.column or \
-           e.block == pot_value.block):
-               e.available_choices.remove(pot_value.value)
-               yield structs.PotentialValue(e.row, e.column, e.block, pot_value.value)
-
-#in mark_unchosen, we've failed to recurse at some point and need to restore the choices we removed in order to continue.
-def mark_unchosen(all_empties, previous_choices):
-    for e in all_empties:
-        for choice in previous_choices:
-            if e.row == choice.row and e.column == choice.column:
-                e.available_choices.add(choice.value)
-
-def guess(button_array, all_empties = None):
-    chosen_empty = None
-    if all_empties is None: #calculate this only once.
-        all_empties = list(filter(lambda i: i.value == 0 and i.hard_set == False, button_array))
-        assert len(all_empties) > 0
-        chosen_empty, all_empties = calculate_optimal_choice(button_array, all_empties)#do the full calculation only once, it's very expensive.  
-    elif len(all_empties) > 0:
-        chosen_empty = min(all_empties, key=lambda e: len(e.available_choices))
-
-    if chosen_empty is not None:
-        debug_print("working on chosen_empty: %s" % (chosen_empty))
-
-        available_choices = chosen_empty.available_choices
-        #available_choices = list(chosen_empty.available_choices)
-        #some puzzles are built to mess with us if we don't introduce at least a small 
-        #amount of randomness.  we're working with the optimal button, but it has 1-9 choices
-        #and you can construct sudokus that really like to mess with solvers that start with 1.
-        #random.shuffle(available_choices)
-
-        #optimization here in case we have several buttons that all have only one available choice.
-        #just set them all now.  
-        #if len(available_choices) == 1:
-        #    only_one_choice_list = utils.find(lambda i: i.available_choices == 1 and not (i.row == chosen_empty.row and i.column == chosen_empty.column), all_empties)
-        #    if only_one_choice_list is not None:
-        #        for empty in only_one_choice_list:
-        #            assert len(list(empty.available_choices)) == 1
-        #            update_button = utils.find(lambda i: i.row == chosen_empty.row and i.column == chosen_empty.column, button_array)
-        #            assert update_button is not None
-        #            update_button.set_value(list(empty.available_choices)[0])
-                
-        
-        update_button = utils.find(lambda i: i.row == chosen_empty.row and i.column == chosen_empty.column, button_array)
-        assert update_button is not None
-        
-        for c in available_choices:
-            globals.total_guesses.set(globals.total_guesses.get() + 1)
-            
-            maybe_update_ui()   
-
-            update_button.set_value(c)
-            all_empties.remove(chosen_empty)
-            pot_value = structs.PotentialValue(chosen_empty.row, chosen_empty.column, chosen_empty.block, c)
-            discarded_choices = list(mark_chosen(all_empties, pot_value))
-
-            if guess(button_array, all_empties):
-                return True #start unwinding
-            else:
-                update_button.set_value(0)
-                mark_unchosen(all_empties, discarded_choices)
-                all_empties.append(chosen_empty)
-
-        #if we make it here then one of the previous values was invalid.  start unwinding.
-        return False
-    else:
-        return True #all done, the remaining values are filled.
 
 def on_button_clicked(button_array, button):
-    if not button.hard_set:
-        new_value = simpledialog.askinteger("Enter a value.", "Number between 1-9, 0 to clear", minvalue=0, maxvalue=9)
+    if globals.solve_worker is not None:
+        messagebox.showinfo("Sudoku Solver", "Still solving, cancel the solve to change the board.")
+    elif not button.hard_set:
+        size = utils.isqrt(len(button_array))
+        new_value = simpledialog.askinteger("Enter a value.", "Number between 1-" + str(size) + ", 0 to clear", minvalue=0, maxvalue=size)
         if new_value is not None and new_value != 0:
             pot_value = structs.PotentialValue(button.row, button.column, button.block, new_value)
             if isNewValueValid(button_array, pot_value):
                 button.set_value(new_value)
             else:
                 #calculate why.
-                conflict = utils.find(lambda b: b.row == button.row and b.value == new_value, button_array)
-                if conflict is None:
-                    conflict = utils.find(lambda b: b.column == button.column and b.value == new_value, button_array)
-                if conflict is None:
-                    conflict = utils.find(lambda b: isButtonInBlock(b, pot_value.row, pot_value.column, get_block_size(button_array)) and b.value == new_value, button_array)
+                row_peers, column_peers, block_peers = get_button_peers(button_array, pot_value)
+                conflict = find_conflict(button_array, row_peers + column_peers + block_peers, pot_value)
                 assert conflict is not None#there's a major issue in the logic if this hits.
                 messagebox.showwarning("Value is not valid.", "The value: " + str(new_value) + " is not a valid value for this location, it conflicts with the button's value at (row:" + str(conflict.row+1) + ", column:" + str(conflict.column+1) + ").  Please try again.")
         elif new_value == 0:
@@ -300,7 +175,95 @@ def on_button_clicked(button_array, button):
     else:
         messagebox.showerror("Sudoku Solver", "May not unset initial condition.")
 
-def startup_ui(rows, columns):
+#every puzzle in a text or packed puzzle file, '-' reads text from stdin.  raises ValueError for bad
+#lines and for files the board can't show.
+def read_puzzle_file(path):
+    if packed.is_packed(path):
+        reader = packed.PackedReader(path)
+        try:
+            grids = [packed.unpack_grid(view, reader.size) for view in reader]
+        finally:
+            reader.close()
+    else:
+        input_file = puzzles.open_input(path)
+        try:
+            grids = list(puzzles.read_puzzles(input_file))
+        finally:
+            if input_file is not sys.stdin:
+                input_file.close()
+    if not grids:
+        raise ValueError('no puzzles in ' + path)
+    too_big = utils.find(lambda grid: len(grid) > MAX_ROWS_COLUMNS, grids)
+    if too_big is not None:
+        raise ValueError('a %sx%s puzzle, maximum rows/columns is %s' % (len(too_big), len(too_big), MAX_ROWS_COLUMNS))
+    return grids
+
+#the frames and buttons for a size x size board, into button_array (emptied first, it's the same list
+#every callback was handed).  whatever board was there before is destroyed.
+def build_board(button_array, size):
+    for frame in globals.board_frames:
+        frame.destroy()
+    globals.board_frames = []
+    del button_array[:]
+    block_size = utils.isqrt(size)
+
+    for r in range(0, size, block_size):
+        for c in range(0, size, block_size):
+            frame = Frame(root, borderwidth=2, background="black")
+            frame.grid(row = (r // block_size), column = (c // block_size))
+            globals.board_frames.append(frame)
+
+    for r in range(size):
+        for c in range(size):
+            correct_frame_index = (r // block_size) * block_size + (c // block_size)
+            correct_frame = globals.board_frames[correct_frame_index]
+
+            button = buttons.SudokuButton(r, c, correct_frame_index, correct_frame, borderwidth = 1)
+            button.configure(command=partial(on_button_clicked, button_array, button))
+            button.grid(row = (r % block_size), column = (c % block_size))
+            button_array.append(button)
+
+#put a puzzle on the board.  a board of the right size is reused as it is, only the values change,
+#which is what keeps stepping through 25x25 and 36x36 files quick.
+def set_puzzle(button_array, grid):
+    if len(grid) * len(grid) != len(button_array):
+        build_board(button_array, len(grid))
+    reset_guesses_count_action()
+    for button, value in zip(button_array, (value for row in grid for value in row)):
+        if value != 0:
+            button.set_init(value)
+        elif button.hard_set:
+            button.unset_init()
+        else:
+            button.set_value(0)
+
+def show_puzzle(button_array, index):
+    globals.puzzle_index = index
+    set_puzzle(button_array, globals.puzzles[index])
+    globals.puzzle_position.set("Puzzle %s of %s" % (index + 1, len(globals.puzzles)))
+    update_step_buttons()
+
+def step_action(step, button_array):
+    index = globals.puzzle_index + step
+    if 0 <= index < len(globals.puzzles):
+        debug_print("Step to puzzle %s.", index)
+        show_puzzle(button_array, index)
+
+def load_action(button_array):
+    debug_print("Load action.")
+    path = filedialog.askopenfilename(title="Load puzzles", filetypes=[("Puzzle files", "*.txt *.sdk"), ("All files", "*")])
+    if not path:
+        return
+    try:
+        grids = read_puzzle_file(path)
+    except (OSError, ValueError) as e:
+        messagebox.showerror("Sudoku Solver", "Could not load %s: %s" % (path, e))
+        return
+    logging.getLogger(__name__).info("Loaded %s puzzles from %s" % (len(grids), path))
+    globals.puzzles = grids
+    show_puzzle(button_array, 0)
+
+def startup_ui(rows, columns, engine_name, propagation, profile_path, puzzle_grids=None):
     #hack global to update the UI?
     global root
     root = Tk()
@@ -309,49 +272,45 @@ def startup_ui(rows, columns):
     root.resizable(0,0)
 
     globals.total_guesses = IntVar()
+    globals.puzzle_position = StringVar()
     button_array = []
 
-    #TODO: this needs to be initializable from somewhere besides this code.
-    #init_values = get_initial_values()
-    init_values = get_harder_initial_values()
-    #init_values = get_medium_initial_values()
+    if puzzle_grids:
+        globals.puzzles = puzzle_grids
+        rows = columns = len(puzzle_grids[0])
+    elif len(get_harder_initial_values()) == rows:
+        #no --puzzle, start with one of the bundled ones.  they are all 9x9, any other size starts out empty.
+        globals.puzzles = [get_harder_initial_values()]
+    else:
+        globals.puzzles = [[[0] * columns for _ in range(rows)]]
 
-    assert isqrt(rows) != -1
+    assert utils.isqrt(rows) != -1
     assert rows == columns
-    block_size = isqrt(rows)
-    
-    frame_array = []
-    for r in range(rows):
-        for c in range(columns):
-            if r % block_size == 0 and c % block_size == 0:
-                frame = Frame(root, borderwidth=2, background="black")
-                frame.grid(row = (r // block_size), column = (c // block_size))
-                frame_array.append(frame)
-    
-    for r in range(rows):
-        for c in range(columns):
-            correct_frame_index = (r // block_size) * block_size + (c // block_size)      
-            correct_frame = frame_array[correct_frame_index]
-
-            button = buttons.SudokuButton(r, c, correct_frame_index, correct_frame, borderwidth = 1)
-            button.configure(command=partial(on_button_clicked, button_array, button))
-            
-            #TODO: all this init code is just to write the solver.  Need to init smarter.
-            init_value = init_values[r][c]
-            if not init_value == 0:
-                button.set_init(init_values[r][c])
-                button.hard_set = True
-            
-            button.grid(row = (r % block_size), column = (c % block_size))
-            button_array.append(button)
 
     #the tkinter framework really wants a no argument function as the callback,
     #so we give it one by partially applying the argument here.
-    solve_button = Button(root, text="Solve", command=partial(solve_action, button_array)).grid(row=rows+1, columnspan=columns, sticky=E+W+N+S)
-    clear_button = Button(root, text="Clear", command=partial(clear_action, False, button_array)).grid(row=rows+2, columnspan=columns, sticky=E+W+N+S)
-    full_clear_button = Button(root, text="Full Clear", command=partial(clear_action, True, button_array)).grid(row=rows+3, columnspan=columns, sticky=E+W+N+S)
-    reset_guesses_button = Button(root, textvariable=globals.total_guesses, command=reset_guesses_count_action).grid(row=rows+4, columnspan=columns, sticky=E+N+S)
-    reset_guesses_label = Label(root, text="Total Guesses:").grid(row=rows+4, columnspan=columns//2, sticky=W+N+S)
+    solve_button = Button(root, text="Solve", command=partial(solve_action, engine_name, propagation, profile_path, button_array))
+    solve_button.grid(row=rows+1, columnspan=columns, sticky=E+W+N+S)
+    globals.cancel_button = Button(root, text="Cancel", command=cancel_action, state=DISABLED)
+    globals.cancel_button.grid(row=rows+2, columnspan=columns, sticky=E+W+N+S)
+    clear_button = Button(root, text="Clear", command=partial(clear_action, False, button_array))
+    clear_button.grid(row=rows+3, columnspan=columns, sticky=E+W+N+S)
+    full_clear_button = Button(root, text="Full Clear", command=partial(clear_action, True, button_array))
+    full_clear_button.grid(row=rows+4, columnspan=columns, sticky=E+W+N+S)
+    reset_guesses_button = Button(root, textvariable=globals.total_guesses, command=reset_guesses_count_action)
+    reset_guesses_button.grid(row=rows+5, columnspan=columns, sticky=E+N+S)
+    reset_guesses_label = Label(root, text="Total Guesses:").grid(row=rows+5, columnspan=columns//2, sticky=W+N+S)
+    load_button = Button(root, text="Load…", command=partial(load_action, button_array))
+    load_button.grid(row=rows+6, columnspan=columns, sticky=E+W+N+S)
+    previous_button = Button(root, text="<", command=partial(step_action, -1, button_array))
+    previous_button.grid(row=rows+7, columnspan=columns, sticky=W+N+S)
+    Label(root, textvariable=globals.puzzle_position).grid(row=rows+7, columnspan=columns)
+    next_button = Button(root, text=">", command=partial(step_action, 1, button_array))
+    next_button.grid(row=rows+7, columnspan=columns, sticky=E+N+S)
+    globals.step_buttons = [previous_button, next_button]
+    globals.action_buttons = [solve_button, clear_button, full_clear_button, reset_guesses_button, load_button]
+
+    show_puzzle(button_array, 0)
     
     #and go into the main loop
     root.mainloop()
@@ -363,7 +322,7 @@ def row_or_column_type(x):
     x = int(x)
     if x > MAX_ROWS_COLUMNS:
         raise argparse.ArgumentTypeError("Maximum rows/columns is " + str(MAX_ROWS_COLUMNS) + ".")
-    elif isqrt(x, raiseOnError=False) == -1: 
+    elif utils.isqrt(x, raiseOnError=False) == -1: 
         raise argparse.ArgumentTypeError("Input is required to be a perfect square.")        
     return x
 
@@ -375,6 +334,10 @@ def setup_args():
     arg_parser.add_argument('--debug', help='turn on debugging information', action='store_true')
     arg_parser.add_argument('--rows', help='number of rows in the sudoku, default: ' + str(default_row_column) + ", max: " + str(MAX_ROWS_COLUMNS) + ".", type=row_or_column_type, default=default_row_column)
     arg_parser.add_argument('--columns', help='number of columns in the sudoku, default: ' + str(default_row_column) + ", max: " + str(MAX_ROWS_COLUMNS) + ".", type=row_or_column_type, default=default_row_column)
+    arg_parser.add_argument('--profile', help='profile every solve and write the pstats output to this file, also logs the search counters.', metavar='FILE', default=None)
+    arg_parser.add_argument('--engine', help='solver backend, default: ' + engines.DEFAULT_ENGINE + '.', choices=list(engines.ENGINES), default=engines.DEFAULT_ENGINE)
+    arg_parser.add_argument('--propagation', help='constraint propagation to run before and during the backtracking search, each level includes the ones before it, default: ' + engine.DEFAULT_PROPAGATION + '.', choices=list(engine.PROPAGATION_LEVELS), default=engine.DEFAULT_PROPAGATION)
+    arg_parser.add_argument('--puzzle', help="text or packed puzzle file to start with, '-' reads stdin.  with more than one puzzle in it < and > step through them.  sets --rows and --columns.", metavar='FILE', default=None)
     
     
     #arg_parser.add_argument('--sum', dest='accumulate', action='store_const',
@@ -391,12 +354,18 @@ def setup_args():
     logging.basicConfig(level=logging_level)
 
     debug_print("Debugging information is turned on")
-    return (args.rows,args.columns)
+
+    puzzle_grids = None
+    if args.puzzle is not None:
+        try:
+            puzzle_grids = read_puzzle_file(args.puzzle)
+        except (OSError, ValueError) as e:
+            arg_parser.error('--puzzle: %s' % e)
+    return (args.rows,args.columns,args.engine,args.propagation,args.profile,puzzle_grids)
 
 #boilerplate
 def main():
-    random.seed()
-    rows,columns = setup_args()
-    startup_ui(rows, columns) 
+    rows,columns,engine_name,propagation,profile_path,puzzle_grids = setup_args()
+    startup_ui(rows, columns, engine_name, propagation, profile_path, puzzle_grids)
 if __name__ == '__main__':
     main()
@@ -11,6 +11,44 @@ class PotentialValue():
         #return 'PotentialValue(row = %s, column = %s, block = %s, value = %s)' % str(self.row), str(self.column), str(self.block), str(self.value)
         return "row = '{0}', column = '{1}', block = '{2}', value = '{3}'\n".format(self.row, self.column, self.block, self.value)
 
+#cells bucketed by how many candidates they have left, so the most constrained cell can be picked
+#without scanning every empty.  buckets are dicts used as ordered sets: O(1) add/remove, and ties
+#come out in the order they went in.
+class CandidateBuckets():
+    def __init__(self, size):
+        self.buckets = [{} for _ in range(size + 1)]
+        self.lowest = size + 1 #no bucket below this one has anything in it.
+        self.count = 0
+
+    def add(self, cell, choices_count):
+        self.buckets[choices_count][cell] = None
+        self.count += 1
+        if choices_count < self.lowest:
+            self.lowest = choices_count
+
+    def remove(self, cell, choices_count):
+        del self.buckets[choices_count][cell]
+        self.count -= 1
+
+    def move(self, cell, old_count, new_count):
+        del self.buckets[old_count][cell]
+        self.buckets[new_count][cell] = None
+        if new_count < self.lowest:
+            self.lowest = new_count
+
+    def __len__(self):
+        return self.count
+
+    def minimum(self):
+        #lowest only ever creeps upwards here, and every add/move can only pull it back down by what it
+        #added, so the skipping is amortised over the updates.
+        buckets = self.buckets
+        lowest = self.lowest
+        while not buckets[lowest]:
+            lowest += 1
+        self.lowest = lowest
+        return next(iter(buckets[lowest])), lowest
+
 #boilerplate
 def main():
     raise Exception("do not directly call this module.")
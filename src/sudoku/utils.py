@@ -2,6 +2,8 @@
 
 from sudoku.constants import DEBUG
 
+import math
+
 #really, this doesn't exist??
 def map_in_place(fn, l):
     for i in range(len(l)):
@@ -13,6 +15,50 @@ def map_in_place(fn, l):
 def find(function, iterable, default_value=None):
     return next(filter(function, iterable), default_value)
 
+def isqrt(n, raiseOnError = True):
+    #from https://stackoverflow.com/questions/15390807/integer-square-root-in-python/17495624
+    #i don't really care that it overflows on large values because the input size is sanitized
+    #much earlier.
+    assert(n >= 0)
+    i = int(math.sqrt(n) + 0.5)
+    if i**2 == n:
+        return i
+    if raiseOnError == True:
+        raise ValueError('input rows/columns were not a perfect square')
+    else:
+        return -1 #clearly not possible
+
+#int.bit_count showed up in 3.10, fall back to counting the binary string on anything older.
+if hasattr(int, 'bit_count'):
+    popcount = int.bit_count
+else:
+    def popcount(n):
+        return bin(n).count('1')
+
+#yields the set bits of a candidate mask as digits, lowest first.  bit d set means digit d.
+def mask_digits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+#argparse type for counts that have to be at least 1.  argparse is only imported to complain, the
+#engine imports this module too.
+def positive_int(x):
+    x = int(x)
+    if x < 1:
+        import argparse
+        raise argparse.ArgumentTypeError("Must be at least 1.")
+    return x
+
+#the same for counts that can be 0.
+def non_negative_int(x):
+    x = int(x)
+    if x < 0:
+        import argparse
+        raise argparse.ArgumentTypeError("Must be at least 0.")
+    return x
+
 #boilerplate
 def main():
     raise Exception("do not directly call this module.")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+#optional numpy path for solving a lot of puzzles at once.
+#a batch of same sized boards is one (B, N, N) uint8 array.  what's taken in every row, column and
+#block of every board comes out of a handful of whole array operations, and naked and hidden singles
+#are placed on every board at the same time, round after round, until nothing changes any more.  most
+#easy and medium puzzles are solved by then without a single python level loop over their cells; the ones
+#left over go to the normal engines one by one, starting from what the singles filled in.
+#numpy isn't needed for anything else, so it's only imported here and only if it's there.
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import sudoku.utils as utils
+import sudoku.engine as engine
+import sudoku.engines as engines
+
+def available():
+    return numpy is not None
+
+#a batch of boards is worked on as one hot (B, band, row in band, stack, column in stack, digit) bool
+#arrays.  a row, a column or a block is then two of those axes, so every unit count is a sum over two
+#axes that broadcasts straight back onto the cells.
+UNIT_AXES = ((3, 4), (1, 2), (2, 4))
+
+#sum over two short axes as whole slices added up, numpy's own reduce is several times slower when the
+#axes it sums over aren't the outer ones.
+def add_over(cells, axes):
+    moved = numpy.moveaxis(cells, axes, (0, 1))
+    total = moved[0, 0].copy()
+    for i in range(moved.shape[0]):
+        for j in range(moved.shape[1]):
+            if i or j:
+                total += moved[i, j]
+    return numpy.expand_dims(total, axes)
+
+def unit_counts(cells):
+    cells = cells.view(numpy.uint8)
+    return [add_over(cells, axes) for axes in UNIT_AXES]
+
+#the digit axis added up, each digit weighted by its value if values is set.
+def add_digits(cells, values = False):
+    cells = cells.view(numpy.uint8)
+    total = cells[..., 0].copy()
+    for d in range(1, cells.shape[-1]):
+        total += cells[..., d] * numpy.uint8(d + 1) if values else cells[..., d]
+    return total
+
+def per_board(cells):
+    return cells.reshape(cells.shape[0], -1).any(axis=1)
+
+"""
+place naked and hidden singles on every board until none of them changes.  boards is a (B, N, N)
+uint8 array, 0 for empty cells.  returns the filled in copy and a (B,) bool array of the boards that
+turned out to have no solution.
+"""
+def propagate(boards):
+    boards = boards.copy()
+    N = boards.shape[1]
+    block_size = utils.isqrt(N)
+    digits = numpy.arange(1, N + 1, dtype=numpy.uint8)
+    dead = (boards > N).any(axis=(1, 2))
+    active = numpy.flatnonzero(~dead)
+    while len(active):
+        grid = boards[active].reshape(len(active), block_size, block_size, block_size, block_size)
+        placed = grid[..., None] == digits
+        empty = (grid == 0)[..., None]
+        placed_counts = unit_counts(placed)
+        taken = (placed_counts[0] | placed_counts[1] | placed_counts[2]) != 0
+        candidates = empty & ~taken
+        choices = add_digits(candidates)[..., None]
+
+        #dead ends: a repeated digit, an empty cell with nothing left, or a digit with nowhere to go.
+        candidate_counts = unit_counts(candidates)
+        stuck = per_board(empty & (choices == 0))
+        for placed_count, candidate_count in zip(placed_counts, candidate_counts):
+            stuck |= per_board(placed_count > 1) | per_board((placed_count | candidate_count) == 0)
+
+        #naked singles, then hidden singles: the only cell of a unit that can still take a digit.
+        once = choices == 1
+        for candidate_count in candidate_counts:
+            once = once | (candidate_count == 1)
+        place = candidates & once
+        placements = add_digits(place)
+        #a cell that has to be two different digits at once.
+        stuck |= per_board(placements > 1)
+
+        values = numpy.where(placements == 1, add_digits(place, True), grid)
+        boards[active] = values.reshape(len(active), N, N)
+        dead[active[stuck]] = True
+        #a board is done with when it's dead or this round changed nothing on it.  two singles of the
+        #same digit in one unit only show up as a duplicate next round, so a board that just got full
+        #goes round once more to be checked.
+        changed = per_board(placements != 0)
+        active = active[~stuck & changed]
+    return boards, dead
+
+"""
+solve a list of grids, the same results as calling engines.solve on each.  grids of different sizes
+can be mixed.  returns (solutions, guesses), a solution is None if there isn't one and guesses is the
+engine's guess count for the puzzles the singles couldn't finish, None for the ones they did.
+"""
+def solve_batch(grids, engine_name=engines.DEFAULT_ENGINE, propagation=engine.DEFAULT_PROPAGATION):
+    solutions = [None] * len(grids)
+    guesses = [None] * len(grids)
+    by_size = {}
+    for i, grid in enumerate(grids):
+        by_size.setdefault(len(grid), []).append(i)
+    for size, indices in by_size.items():
+        boards, dead = propagate(numpy.array([grids[i] for i in indices], dtype=numpy.uint8))
+        unfinished = (boards == 0).any(axis=(1, 2))
+        for k, i in enumerate(indices):
+            if dead[k]:
+                continue
+            if not unfinished[k]:
+                solutions[i] = boards[k].tolist()
+                continue
+            stats = {}
+            solutions[i] = engines.solve(boards[k].tolist(), stats, engine_name, propagation)
+            guesses[i] = stats['guesses']
+    return solutions, guesses
+
+#boilerplate
+def main():
+    raise Exception("do not directly call this module.")
+if __name__ == '__main__':
+    main()
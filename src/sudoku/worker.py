@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+#runs a solve on a background thread so the gui's event loop never has to wait on the search.
+#the thread drives board.search() a chunk of guesses at a time.  between chunks it checks for a cancel
+#and, every so often, puts a progress message on a queue for the gui to pick up.  the gui never touches
+#the board while the thread is alive, everything it needs comes through the queue.
+#nothing in here touches tkinter.
+
+import threading, queue, time
+
+import sudoku.instrumentation as instrumentation
+
+#guesses per search() call, small enough that a cancel or a progress message is never far off.
+DEFAULT_CHUNK_GUESSES = 256
+#seconds between progress messages.
+DEFAULT_PROGRESS_INTERVAL = 0.1
+
+#what comes out of the queue:
+#(PROGRESS, guesses, depth, values) every progress interval, values is a flat copy of the board.
+#(DONE, solved, board) exactly once at the end.  solved is True, False, or None if it was cancelled.
+PROGRESS = 'progress'
+DONE = 'done'
+
+class SolveWorker(threading.Thread):
+    def __init__(self, board, profile_path = None, chunk_guesses = DEFAULT_CHUNK_GUESSES, progress_interval = DEFAULT_PROGRESS_INTERVAL):
+        #daemon, so a solve that's still going doesn't keep the process alive once the window is closed.
+        super().__init__(daemon=True)
+        self.board = board
+        self.profile_path = profile_path
+        self.chunk_guesses = chunk_guesses
+        self.progress_interval = progress_interval
+        self.messages = queue.Queue()
+        self.cancelled = threading.Event()
+
+    #ask the search to stop, it does so at the end of the chunk it's on.
+    def cancel(self):
+        self.cancelled.set()
+
+    def publish_progress(self):
+        board = self.board
+        self.messages.put((PROGRESS, board.guesses, board.depth(), board.partial_values()))
+
+    def run(self):
+        solved = None
+        #cProfile only sees the thread it was started on, so the profiling has to happen in here.
+        with instrumentation.profiled(self.profile_path):
+            last_progress = time.perf_counter()
+            while not self.cancelled.is_set():
+                solved = self.board.search(self.chunk_guesses)
+                if solved is not None:
+                    break
+                now_time = time.perf_counter()
+                if now_time - last_progress > self.progress_interval:
+                    last_progress = now_time
+                    self.publish_progress()
+        self.messages.put((DONE, solved, self.board))
+
+    #everything waiting on the queue, never blocks.
+    def drain(self):
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+#boilerplate
+def main():
+    raise Exception("do not directly call this module.")
+if __name__ == '__main__':
+    main()
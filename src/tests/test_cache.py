@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+#canonical keys and the solution cache in sudoku.cache.  run from src:
+#python3 -m unittest discover -s tests (or python3 -m pytest tests).
+
+import unittest, random, tempfile, os
+
+import sudoku.puzzles as puzzles
+import sudoku.corpus as corpus
+import sudoku.cache as cache
+import sudoku.generator as generator
+from test_engine import is_solution, NO_SOLUTION
+
+PUZZLES = [(name, puzzles.parse_line(line)) for puzzle_class in corpus.CORPUS.values() for name, line in puzzle_class]
+
+class CanonicalTest(unittest.TestCase):
+    def test_relabelling(self):
+        rnd = random.Random(1)
+        for name, grid in PUZZLES:
+            key = cache.canonicalise(grid)[0]
+            size = len(grid)
+            for _ in range(10):
+                relabel = [0] + rnd.sample(range(1, size + 1), size)
+                with self.subTest(puzzle=name):
+                    self.assertEqual(cache.canonicalise([[relabel[value] for value in row] for row in grid])[0], key)
+
+    #the key is only exact up to ties between lines, which none of the corpus puzzles have.
+    def test_random_transforms(self):
+        rnd = random.Random(2)
+        for name, grid in PUZZLES:
+            key = cache.canonicalise(grid)[0]
+            for _ in range(20):
+                transform = generator.random_transform(len(grid), rnd)
+                with self.subTest(puzzle=name, transposed=transform.transposed):
+                    self.assertEqual(cache.canonicalise(transform.apply(grid))[0], key)
+
+    def test_invert(self):
+        rnd = random.Random(3)
+        for name, grid in PUZZLES:
+            key, canonical_transform = cache.canonicalise(grid)
+            with self.subTest(puzzle=name):
+                self.assertEqual(puzzles.format_grid(canonical_transform.apply(grid)), key)
+                self.assertEqual(canonical_transform.invert(canonical_transform.apply(grid)), grid)
+                transform = generator.random_transform(len(grid), rnd)
+                self.assertEqual(transform.invert(transform.apply(grid)), grid)
+
+    def test_different_puzzles(self):
+        keys = set(cache.canonicalise(grid)[0] for name, grid in PUZZLES)
+        self.assertEqual(len(keys), len(PUZZLES))
+
+class SolutionCacheTest(unittest.TestCase):
+    #the 9x9s only, the big boards take long enough to solve that a couple of them is plenty.
+    def test_hit_on_transformed_copy(self):
+        rnd = random.Random(4)
+        solutions = cache.SolutionCache()
+        for name, grid in [(name, grid) for name, grid in PUZZLES if len(grid) == 9] + PUZZLES[-2:]:
+            with self.subTest(puzzle=name):
+                stats = {}
+                self.assertTrue(is_solution(grid, cache.solve(grid, solutions, stats)))
+                self.assertFalse(stats['cached'])
+                copy = generator.random_transform(len(grid), rnd).apply(grid)
+                stats = {}
+                self.assertTrue(is_solution(copy, cache.solve(copy, solutions, stats)))
+                self.assertTrue(stats['cached'])
+                self.assertEqual(stats['guesses'], 0)
+
+    #a miss on the copy first has to store a solution that is still right for the original.
+    def test_miss_on_transformed_copy(self):
+        rnd = random.Random(5)
+        for name, grid in PUZZLES[:6]:
+            solutions = cache.SolutionCache()
+            copy = generator.random_transform(len(grid), rnd).apply(grid)
+            with self.subTest(puzzle=name):
+                self.assertTrue(is_solution(copy, cache.solve(copy, solutions)))
+                stats = {}
+                self.assertTrue(is_solution(grid, cache.solve(grid, solutions, stats)))
+                self.assertTrue(stats['cached'])
+
+    def test_no_solution(self):
+        solutions = cache.SolutionCache()
+        self.assertIsNone(cache.solve(NO_SOLUTION, solutions))
+        stats = {}
+        self.assertIsNone(cache.solve(NO_SOLUTION, solutions, stats))
+        self.assertTrue(stats['cached'])
+
+    def test_counters(self):
+        solutions = cache.SolutionCache(maxsize=2)
+        for name, grid in PUZZLES[:3]:
+            cache.solve(grid, solutions)
+        cache.solve(PUZZLES[2][1], solutions)
+        self.assertEqual(solutions.counters(), {'hits': 1, 'misses': 3, 'evictions': 1, 'size': 2})
+
+    def test_persistent(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache.sqlite')
+            name, grid = PUZZLES[0]
+            solutions = cache.SolutionCache(path=path)
+            solved = cache.solve(grid, solutions)
+            solutions.close()
+            solutions = cache.SolutionCache(path=path)
+            try:
+                stats = {}
+                self.assertEqual(cache.solve(grid, solutions, stats), solved)
+                self.assertTrue(stats['cached'])
+            finally:
+                solutions.close()
+
+if __name__ == '__main__':
+    unittest.main()
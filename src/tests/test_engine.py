@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+#regression tests for the search in sudoku.engine and sudoku.dlx.  run from src:
+#python3 -m unittest discover -s tests (or python3 -m pytest tests).
+
+import unittest
+
+import sudoku.puzzles as puzzles
+import sudoku.corpus as corpus
+import sudoku.engine as engine
+import sudoku.engines as engines
+
+#a handful from every corpus class, the big boards included, plus one with no solution.
+PUZZLES = [(name, puzzles.parse_line(line)) for puzzle_class in corpus.CORPUS.values() for name, line in puzzle_class[:2]]
+NO_SOLUTION = puzzles.parse_line('11' + '.' * 79)
+
+def is_solution(grid, solution):
+    size = len(grid)
+    block_size = int(size ** 0.5)
+    digits = list(range(1, size + 1))
+    units = [[(r, c) for c in range(size)] for r in range(size)]
+    units += [[(r, c) for r in range(size)] for c in range(size)]
+    units += [[(br + r, bc + c) for r in range(block_size) for c in range(block_size)]
+              for br in range(0, size, block_size) for bc in range(0, size, block_size)]
+    return (all(sorted(solution[r][c] for r, c in unit) == digits for unit in units)
+            and all(grid[r][c] in (0, solution[r][c]) for r in range(size) for c in range(size)))
+
+#search() a chunk of guesses at a time until it's done.
+def chunked_search(board, chunk):
+    while True:
+        found = board.search(chunk)
+        if found is not None:
+            return found
+
+class SearchTest(unittest.TestCase):
+    #guess() is the recursive reference, search() has to walk exactly the same tree.
+    def test_guess_matches_search(self):
+        for propagation in engine.PROPAGATION_LEVELS:
+            for name, grid in PUZZLES + [('no solution', NO_SOLUTION)]:
+                if len(grid) > 16 and propagation in ('none', 'naked'):
+                    continue #minutes on the 25x25s without hidden singles.
+                with self.subTest(puzzle=name, propagation=propagation):
+                    recursive = engine.Board(grid, propagation)
+                    solved = recursive.consistent and recursive.propagate() and recursive.guess()
+                    iterative = engine.Board(grid, propagation)
+                    self.assertEqual(iterative.search(), bool(solved))
+                    self.assertEqual(iterative.guesses, recursive.guesses)
+                    if solved:
+                        self.assertEqual(iterative.to_grid(), recursive.to_grid())
+                        self.assertTrue(is_solution(grid, iterative.to_grid()))
+
+    #stopping and picking up again every few guesses must not change the search at all.
+    def test_chunked_search_matches_search(self):
+        for engine_name, board_class in engines.ENGINES.items():
+            for name, grid in PUZZLES + [('no solution', NO_SOLUTION)]:
+                whole = board_class(grid)
+                found = whole.search()
+                for chunk in (1, 7, 256):
+                    with self.subTest(engine=engine_name, puzzle=name, chunk=chunk):
+                        board = board_class(grid)
+                        self.assertEqual(chunked_search(board, chunk), found)
+                        self.assertEqual(board.guesses, whole.guesses)
+                        if found:
+                            self.assertEqual(board.to_grid(), whole.to_grid())
+
+    def test_engines_agree(self):
+        for name, grid in PUZZLES:
+            solutions = {engine_name: engines.solve(grid, None, engine_name) for engine_name in engines.ENGINES}
+            for engine_name, solution in solutions.items():
+                with self.subTest(engine=engine_name, puzzle=name):
+                    self.assertIsNotNone(solution)
+                    self.assertTrue(is_solution(grid, solution))
+        for engine_name in engines.ENGINES:
+            self.assertIsNone(engines.solve(NO_SOLUTION, None, engine_name))
+
+if __name__ == '__main__':
+    unittest.main()
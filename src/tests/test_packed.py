@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+#round trips through the packed file format in sudoku.packed.  run from src:
+#python3 -m unittest discover -s tests (or python3 -m pytest tests).
+
+import unittest, random, tempfile, os, io
+
+import sudoku.puzzles as puzzles
+import sudoku.corpus as corpus
+import sudoku.packed as packed
+
+SIZES = (4, 9, 16, 25, 36)
+
+#random cells, 0 included, and the extremes, so every bit of every cell gets used.
+def random_grids(size, count, seed=1):
+    rnd = random.Random(seed)
+    yield [[0] * size for _ in range(size)]
+    yield [[size] * size for _ in range(size)]
+    for _ in range(count):
+        yield [[rnd.randint(0, size) for _ in range(size)] for _ in range(size)]
+
+class PackedTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'puzzles.sdk')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_grid_round_trip(self):
+        for size in SIZES:
+            bits = packed.get_bits(size)
+            for grid in random_grids(size, 20):
+                with self.subTest(size=size):
+                    data = packed.pack_grid(grid, bits)
+                    self.assertEqual(len(data), packed.get_cell_bytes(size))
+                    self.assertEqual(packed.unpack_grid(data, size), grid)
+                    self.assertEqual(packed.unpack_grid(memoryview(data), size), grid)
+
+    def test_file_round_trip(self):
+        for size in SIZES:
+            for solutions, stats in ((False, False), (True, False), (False, True), (True, True)):
+                with self.subTest(size=size, solutions=solutions, stats=stats):
+                    rnd = random.Random(size)
+                    expected = []
+                    for k, grid in enumerate(random_grids(size, 10, seed=size)):
+                        #every third record without a solution, that has to come back as None.
+                        solution = [[rnd.randint(1, size) for _ in range(size)] for _ in range(size)] if k % 3 else None
+                        expected.append((grid, solution, rnd.randrange(1 << 32)))
+                    writer = packed.PackedWriter(self.path, size, solutions, stats)
+                    for grid, solution, guesses in expected:
+                        writer.write(grid, solution, guesses)
+                    writer.close()
+                    self.assertTrue(packed.is_packed(self.path))
+
+                    reader = packed.PackedReader(self.path)
+                    try:
+                        self.assertEqual(len(reader), len(expected))
+                        self.assertEqual(reader.size, size)
+                        self.assertEqual([packed.unpack_grid(view, size) for view in reader], [grid for grid, solution, guesses in expected])
+                        self.assertEqual(list(reader.records()),
+                                         [(grid, solution if solutions else None, guesses if stats else None) for grid, solution, guesses in expected])
+                    finally:
+                        reader.close()
+
+    def test_wrong_size(self):
+        writer = packed.PackedWriter(self.path, 9)
+        try:
+            with self.assertRaises(ValueError):
+                writer.write([[0] * 4 for _ in range(4)])
+        finally:
+            writer.close()
+
+    def test_not_packed(self):
+        with open(self.path, 'w') as f:
+            f.write('.' * 81 + '\n')
+        self.assertFalse(packed.is_packed(self.path))
+        with self.assertRaises(ValueError):
+            packed.PackedReader(self.path)
+
+    def test_cut_short(self):
+        writer = packed.PackedWriter(self.path, 9)
+        for grid in random_grids(9, 3):
+            writer.write(grid)
+        writer.close()
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 1)
+        with self.assertRaises(ValueError):
+            packed.PackedReader(self.path)
+
+    #text -> packed -> text, solving on the way, for every board size in the corpus.
+    def test_text_round_trip(self):
+        lines = {}
+        for puzzle_class in corpus.CORPUS.values():
+            for name, line in puzzle_class[:3]:
+                lines.setdefault(len(puzzles.parse_line(line)), []).append(puzzles.format_grid(puzzles.parse_line(line)))
+        for size, size_lines in lines.items():
+            with self.subTest(size=size):
+                self.assertEqual(packed.pack(io.StringIO('\n'.join(size_lines) + '\n'), self.path, solve=True), len(size_lines))
+                output = io.StringIO()
+                packed.unpack(self.path, output)
+                self.assertEqual(output.getvalue().splitlines(), size_lines)
+                output = io.StringIO()
+                packed.unpack(self.path, output, solutions=True)
+                for line, solution in zip(size_lines, output.getvalue().splitlines()):
+                    grid, solved = puzzles.parse_line(line), puzzles.parse_line(solution)
+                    self.assertTrue(all(grid[r][c] in (0, solved[r][c]) for r in range(size) for c in range(size)))
+                    self.assertNotIn(0, [value for row in solved for value in row])
+
+    def test_unpack_without_solutions(self):
+        packed.pack(io.StringIO(corpus.CORPUS['easy'][0][1] + '\n'), self.path)
+        with self.assertRaises(ValueError):
+            packed.unpack(self.path, io.StringIO(), solutions=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+#the subtree split in sudoku.parallel against engine.count_solutions and brute force.  run from src:
+#python3 -m unittest discover -s tests (or python3 -m pytest tests).
+
+import unittest, itertools
+
+import sudoku.puzzles as puzzles
+import sudoku.engine as engine
+import sudoku.parallel as parallel
+from test_engine import is_solution, NO_SOLUTION
+from test_solutions import GRIDS_4, random_puzzles
+
+DEPTHS = (0, 1, 2, 3, 16)
+
+def brute_force_solutions(grid):
+    return sorted(puzzles.format_grid(solution) for solution in GRIDS_4 if all(grid[r][c] in (0, solution[r][c]) for r in range(4) for c in range(4)))
+
+class ParallelTest(unittest.TestCase):
+    def setUp(self):
+        self.searches = {depth: parallel.ParallelSearch(1, depth) for depth in DEPTHS}
+
+    def tearDown(self):
+        for search in self.searches.values():
+            search.close()
+
+    #the subtrees' solutions together have to be exactly the puzzle's, at any depth.
+    def test_all_solutions(self):
+        for grid in itertools.islice(random_puzzles(300, seed=3), 60):
+            expected = brute_force_solutions(grid)
+            self.assertEqual(len(expected), engine.count_solutions(grid, 1000))
+            for depth, search in self.searches.items():
+                with self.subTest(puzzle=puzzles.format_grid(grid), depth=depth):
+                    stats = {}
+                    self.assertEqual(sorted(puzzles.format_grid(solution) for solution in search.solutions(grid, None, stats)), expected)
+                    subtrees, guesses = parallel.split(grid, depth)
+                    self.assertEqual(stats['subtrees'], len(subtrees))
+
+    #stopping at the limit sets the cancel event, the next puzzle must not see it.
+    def test_limit(self):
+        for grid in itertools.islice(random_puzzles(300, seed=4), 60):
+            expected = engine.count_solutions(grid, 1000)
+            for depth, search in self.searches.items():
+                for limit in (1, 2, 5):
+                    with self.subTest(puzzle=puzzles.format_grid(grid), depth=depth, limit=limit):
+                        found = search.solutions(grid, limit)
+                        self.assertEqual(len(found), min(expected, limit))
+                        self.assertEqual(len(set(puzzles.format_grid(solution) for solution in found)), len(found))
+                        self.assertTrue(all(is_solution(grid, solution) for solution in found))
+                        self.assertFalse(search.cancel.is_set())
+                self.assertEqual(len(search.solutions(grid)), expected)
+
+    def test_no_solution(self):
+        #no repeats in any unit, the search has to find out on its own.
+        dead = [[0, 3, 0, 0], [0, 0, 3, 0], [0, 0, 1, 4], [0, 2, 0, 0]]
+        self.assertEqual(engine.count_solutions(NO_SOLUTION, 2), 0)
+        self.assertEqual(engine.count_solutions(dead, 2), 0)
+        for depth, search in self.searches.items():
+            with self.subTest(depth=depth):
+                self.assertEqual(search.solutions(NO_SOLUTION), [])
+                self.assertIsNone(search.solve(NO_SOLUTION))
+                self.assertEqual(parallel.split(NO_SOLUTION, depth)[0], [])
+                self.assertEqual(search.solutions(dead, 2), [])
+
+    #the same through a real pool, the results come back in any order.
+    def test_pool(self):
+        search = parallel.ParallelSearch(2, 2)
+        try:
+            for grid in itertools.islice(random_puzzles(300, seed=5), 10):
+                with self.subTest(puzzle=puzzles.format_grid(grid)):
+                    self.assertEqual(sorted(puzzles.format_grid(solution) for solution in search.solutions(grid)), brute_force_solutions(grid))
+                    self.assertEqual(len(search.solutions(grid, 1)), min(1, len(brute_force_solutions(grid))))
+        finally:
+            search.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+#solution counting (engine.count_solutions, engines.solutions) against brute force.  run from src:
+#python3 -m unittest discover -s tests (or python3 -m pytest tests).
+
+import unittest, random, itertools
+
+import sudoku.puzzles as puzzles
+import sudoku.corpus as corpus
+import sudoku.engine as engine
+import sudoku.engines as engines
+from test_engine import is_solution
+
+#every complete 4x4 grid, filled in cell by cell with nothing but the rules, no engine code involved.
+def all_grids(size=4):
+    block_size = int(size ** 0.5)
+    cells = [0] * (size * size)
+    grids = []
+    def fill(i):
+        if i == len(cells):
+            grids.append([cells[r * size:(r + 1) * size] for r in range(size)])
+            return
+        r, c = divmod(i, size)
+        for value in range(1, size + 1):
+            if any(cells[r * size + k] == value for k in range(c)) or any(cells[k * size + c] == value for k in range(r)):
+                continue
+            br, bc = r - r % block_size, c - c % block_size
+            if any(cells[(br + k // block_size) * size + bc + k % block_size] == value for k in range(block_size * block_size) if (br + k // block_size) * size + bc + k % block_size < i):
+                continue
+            cells[i] = value
+            fill(i + 1)
+        cells[i] = 0
+    fill(0)
+    return grids
+
+GRIDS_4 = all_grids()
+
+#how many complete grids keep the puzzle's givens.
+def brute_force_count(grid):
+    return sum(1 for solution in GRIDS_4 if all(grid[r][c] in (0, solution[r][c]) for r in range(4) for c in range(4)))
+
+def random_puzzles(count, seed=1):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        grid = [row[:] for row in rnd.choice(GRIDS_4)]
+        for r, c in itertools.product(range(4), range(4)):
+            if rnd.random() < 0.6:
+                grid[r][c] = 0
+        if rnd.random() < 0.2:
+            #a random given, often one that leaves no solution at all.
+            grid[rnd.randrange(4)][rnd.randrange(4)] = rnd.randint(1, 4)
+        yield grid
+
+class CountTest(unittest.TestCase):
+    def test_brute_force_grid_count(self):
+        self.assertEqual(len(GRIDS_4), 288)
+
+    def test_count_solutions_matches_brute_force(self):
+        for grid in random_puzzles(300):
+            expected = brute_force_count(grid)
+            for propagation in engine.PROPAGATION_LEVELS:
+                with self.subTest(puzzle=puzzles.format_grid(grid), propagation=propagation):
+                    self.assertEqual(engine.count_solutions(grid, 1000, None, propagation), expected)
+                    self.assertEqual(engine.count_solutions(grid, 2, None, propagation), min(expected, 2))
+
+    def test_empty_board(self):
+        self.assertEqual(engine.count_solutions([[0] * 4 for _ in range(4)], 1000), 288)
+
+    def test_solutions_are_distinct_and_valid(self):
+        for grid in itertools.islice(random_puzzles(300, seed=2), 50):
+            expected = brute_force_count(grid)
+            for engine_name in engines.ENGINES:
+                with self.subTest(puzzle=puzzles.format_grid(grid), engine=engine_name):
+                    found = engines.solutions(grid, 1000, None, engine_name)
+                    self.assertEqual(len(found), expected)
+                    self.assertEqual(len(set(puzzles.format_grid(solution) for solution in found)), expected)
+                    self.assertTrue(all(is_solution(grid, solution) for solution in found))
+
+    #no brute force at 9x9, but every engine and propagation level has to agree on proper puzzles and
+    #on one with givens taken out.
+    def test_9x9_agreement(self):
+        proper = [puzzles.parse_line(line) for name, line in corpus.CORPUS['hard']]
+        loose = [row[:] for row in proper[0]]
+        taken = 0
+        for r, c in itertools.product(range(9), range(9)):
+            if loose[r][c] and taken < 6:
+                loose[r][c] = 0
+                taken += 1
+        counts = set()
+        for propagation in engine.PROPAGATION_LEVELS:
+            for grid in proper:
+                self.assertEqual(engine.count_solutions(grid, 2, None, propagation), 1)
+            counts.add(engine.count_solutions(loose, 1000, None, propagation))
+        for engine_name in engines.ENGINES:
+            counts.add(len(engines.solutions(loose, 1000, None, engine_name)))
+        self.assertEqual(len(counts), 1)
+        self.assertGreater(counts.pop(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+#the numpy singles in sudoku.vectorised against the engine, skipped without numpy.  run from src:
+#python3 -m unittest discover -s tests (or python3 -m pytest tests).
+
+import unittest, random
+
+import sudoku.puzzles as puzzles
+import sudoku.corpus as corpus
+import sudoku.engines as engines
+import sudoku.generator as generator
+import sudoku.vectorised as vectorised
+from test_engine import is_solution
+
+#random puzzles at every small size: proper ones, ones with clues taken out at random (often many
+#solutions) and ones with a random given thrown in (often none at all).
+def random_puzzles(size, count, seed):
+    rnd = random.Random(seed)
+    for k in range(count):
+        solution = generator.random_solution(size, rnd)
+        grid = [[value if rnd.random() < 0.45 else 0 for value in row] for row in solution]
+        if k % 4 == 1:
+            grid[rnd.randrange(size)][rnd.randrange(size)] = rnd.randint(1, size)
+        elif k % 4 == 2:
+            #two of the same digit in a row, dead from the start.
+            r = rnd.randrange(size)
+            grid[r][0] = grid[r][1] = rnd.randint(1, size)
+        yield grid
+
+@unittest.skipUnless(vectorised.available(), 'numpy is not installed')
+class VectorisedTest(unittest.TestCase):
+    def check_batch(self, grids):
+        solutions, guesses = vectorised.solve_batch(grids)
+        self.assertEqual(len(solutions), len(grids))
+        for grid, solution in zip(grids, solutions):
+            expected = engines.solve(grid)
+            with self.subTest(puzzle=puzzles.format_grid(grid)):
+                self.assertEqual(solution is None, expected is None)
+                if solution is not None:
+                    self.assertTrue(is_solution(grid, solution))
+
+    def test_random_puzzles(self):
+        for size, count in ((4, 200), (9, 200), (16, 40)):
+            with self.subTest(size=size):
+                self.check_batch(list(random_puzzles(size, count, seed=size)))
+
+    def test_mixed_sizes(self):
+        grids = [grid for size in (4, 9, 16) for grid in random_puzzles(size, 8, seed=size + 1)]
+        random.Random(1).shuffle(grids)
+        self.check_batch(grids)
+
+    #proper puzzles have only the one solution, so it has to be the engine's to the cell.
+    def test_corpus(self):
+        grids = [puzzles.parse_line(line) for puzzle_class in corpus.CORPUS.values() for name, line in puzzle_class]
+        solutions, guesses = vectorised.solve_batch(grids)
+        for grid, solution in zip(grids, solutions):
+            with self.subTest(puzzle=puzzles.format_grid(grid)):
+                self.assertEqual(solution, engines.solve(grid))
+
+    def test_propagate_dead_and_full(self):
+        import numpy
+        solution = generator.random_solution(9, random.Random(2))
+        repeated = [row[:] for row in solution]
+        repeated[0][0] = repeated[0][1]
+        out_of_range = [row[:] for row in solution]
+        out_of_range[4][4] = 10
+        boards, dead = vectorised.propagate(numpy.array([solution, repeated, out_of_range], dtype=numpy.uint8))
+        self.assertEqual(dead.tolist(), [False, True, True])
+        self.assertEqual(boards[0].tolist(), solution)
+
+if __name__ == '__main__':
+    unittest.main()